@@ -92,6 +92,14 @@ class TestParcel:
         d = p.to_dict()
         assert d == {'x0': 0.0, 'x1': 0.5, 'q': {1: 1.0}}
 
+    def test_from_dict_round_trip_with_volume(self):
+        from victoria.fifo import Parcel
+        d = {'x0': 0.25, 'x1': 1.0, 'q': {2: 1.0}, 'volume': 3.0}
+        p = Parcel.from_dict(d)
+        assert p.to_dict() == d
+        assert p == Parcel(0.25, 1.0, {2: 1.0}, 3.0)
+        assert not hasattr(p, '__dict__')
+
 
 # ---------------------------------------------------------------------------
 # fifo.py — FIFO base class
@@ -222,6 +230,33 @@ class TestPipe:
         assert p.state[0]['q'] == {2: 1.0}
         assert p.state[0]['x0'] == 0.0
 
+    def test_merge_adjacent_copies_unless_in_place(self):
+        from victoria.fifo import _merge_adjacent
+        state = [
+            {'x0': 0.0, 'x1': 0.5, 'q': {1: 1.0}},
+            {'x0': 0.5, 'x1': 1.0, 'q': {1: 1.0}},
+        ]
+        merged = _merge_adjacent(state, 0.005)
+        assert merged == [{'x0': 0.0, 'x1': 1.0, 'q': {1: 1.0}}]
+        assert state[0]['x1'] == 0.5
+        merged = _merge_adjacent(state, 0.005, in_place=True)
+        assert merged[0] is state[0] and state[0]['x1'] == 1.0
+
+    def test_push_pull_only_edge_parcels_exit(self):
+        from victoria.fifo import Pipe
+        p = Pipe(volume=10.0)
+        p.state = [
+            {'x0': 0.0, 'x1': 0.3, 'q': {1: 1.0}},
+            {'x0': 0.3, 'x1': 0.6, 'q': {2: 1.0}},
+            {'x0': 0.6, 'x1': 1.0, 'q': {3: 1.0}},
+        ]
+        p.push_pull(2.0, [[2.0, {4: 1.0}]])
+        assert [s['q'] for s in p.output_state] == [{3: 1.0}]
+        assert p.output_state[0]['volume'] == pytest.approx(2.0)
+        assert [s['q'] for s in p.state] == [
+            {4: 1.0}, {1: 1.0}, {2: 1.0}, {3: 1.0}]
+        assert p.state[0]['x0'] == 0.0 and p.state[-1]['x1'] == 1.0
+
 
 # ---------------------------------------------------------------------------
 # fifo.py — ZeroLengthFIFO / Pump / Valve
@@ -275,6 +310,12 @@ class TestMixMergeLoad:
         MIX.merge_load(existing, {2: 1.0}, 1.0)
         assert existing == {1: 0.5}  # unchanged
 
+    def test_add_load_updates_in_place(self):
+        from victoria.mix import MIX
+        acc = {1: 0.4}
+        assert MIX.add_load(acc, {1: 1.0, 2: 1.0}, 0.5) is None
+        assert acc == pytest.approx({1: 0.9, 2: 0.5})
+
 
 # ---------------------------------------------------------------------------
 # mix.py — MIX.parcels_out
@@ -299,6 +340,16 @@ class TestMixParcelsOut:
         vol1 = m.outflow[1][0][0]
         assert pytest.approx(vol0 / vol1, rel=1e-5) == 3.0 / 7.0
 
+    def test_parcels_out_single_link(self):
+        from victoria.mix import MIX
+        m = MIX()
+        m.mixed_parcels = [
+            {'x0': 0.0, 'x1': 0.25, 'q': {1: 1.0}, 'volume': 8.0},
+            {'x0': 0.25, 'x1': 1.0, 'q': {2: 1.0}, 'volume': 8.0},
+        ]
+        m.parcels_out([5.0])
+        assert m.outflow == [[[2.0, {1: 1.0}], [6.0, {2: 1.0}]]]
+
 
 # ---------------------------------------------------------------------------
 # mix.py — Reservoir
@@ -362,6 +413,48 @@ class TestJunction:
         assert len(j.mixed_parcels) == 1
         assert j.mixed_parcels[0]['q'] == {1: 1.0}
 
+    def test_mix_unsorted_inflow(self):
+        from victoria.mix import Junction
+        j = Junction()
+        j.eps_merge = 0.0
+        node = MagicMock()
+        node.demand = 0.0
+        node.downstream_links = []
+        inflow = [
+            {'x0': 0.5, 'x1': 1.0, 'q': {2: 1.0}, 'volume': 10.0},
+            {'x0': 0.0, 'x1': 0.5, 'q': {1: 1.0}, 'volume': 10.0},
+        ]
+        j.mix(inflow, node, 3600, {})
+        assert [p['q'] for p in j.mixed_parcels] == [{1: 1.0}, {2: 1.0}]
+        assert [p['x0'] for p in j.mixed_parcels] == [0.0, 0.5]
+
+    def test_mix_interns_equal_mixtures(self):
+        from victoria.mix import Junction
+        node = MagicMock()
+        node.demand = 0.0
+        node.downstream_links = []
+        j1, j2, j3 = Junction(), Junction(), Junction()
+        j2._q_pool = j1._q_pool
+        j1.mix(self._simple_inflow({1: 0.25, 2: 0.75}), node, 3600, {})
+        j2.mix(self._simple_inflow({2: 0.75, 1: 0.25}), node, 3600, {})
+        j3.mix(self._simple_inflow({1: 0.25, 2: 0.75}), node, 3600, {})
+        assert j1.mixed_parcels[0]['q'] is j2.mixed_parcels[0]['q']
+        assert j1.mixed_parcels[0]['q'] is not j3.mixed_parcels[0]['q']
+
+    def test_mixed_parcels_list_reused_after_merge(self):
+        from victoria.mix import Junction
+        j = Junction()
+        node = MagicMock()
+        node.demand = 0.0
+        node.downstream_links = []
+        inflow = [
+            {'x0': 0.0, 'x1': 0.5, 'q': {1: 1.0}, 'volume': 10.0},
+            {'x0': 0.5, 'x1': 1.0, 'q': {1: 1.0}, 'volume': 10.0},
+        ]
+        parcels = j.mixed_parcels
+        j.mix(inflow, node, 3600, {})
+        assert j.mixed_parcels is parcels and len(parcels) == 1
+
 
 # ---------------------------------------------------------------------------
 # mix.py — Tank_CSTR
@@ -397,6 +490,26 @@ class TestTankCSTR:
         t.mix(inflow, node, 3600, {})
 
 
+# ---------------------------------------------------------------------------
+# mix.py — Tank_FIFO
+# ---------------------------------------------------------------------------
+
+class TestTankFIFO:
+    def test_mixed_parcels_list_reused(self):
+        from victoria.mix import Tank_FIFO
+        t = Tank_FIFO(10.0)
+        t.state.append({'x0': 0.0, 'x1': 1.0, 'q': {1: 1.0}})
+        node = MagicMock()
+        node.downstream_links = [MagicMock(flow=3600.0)]
+        parcels = t.mixed_parcels
+        inflow  = [{'x0': 0.0, 'x1': 1.0, 'q': {2: 1.0}, 'volume': 1.0}]
+        t.mix(inflow, node, 1.0, {})
+        first = list(parcels)
+        t.mix(inflow, node, 1.0, {})
+        assert t.mixed_parcels is parcels
+        assert parcels and not any(p is q for p in parcels for q in first)
+
+
 # ---------------------------------------------------------------------------
 # mix.py — _get_links and _round_dict_values helpers
 # ---------------------------------------------------------------------------
@@ -414,6 +527,34 @@ class TestMixHelpers:
         node.upstream_links = MagicMock(return_value=['link1'])
         assert _get_links(node, 'upstream') == ['link1']
 
+    def test_get_links_resolved_once_per_class(self):
+        from victoria.mix import _get_links, _accessor_is_method
+
+        class PropNode:
+            @property
+            def downstream_links(self):
+                return ['p']
+
+        class MethodNode:
+            def downstream_links(self):
+                return ['m']
+
+        assert _get_links(PropNode(), 'downstream') == ['p']
+        assert _get_links(MethodNode(), 'downstream') == ['m']
+        assert _accessor_is_method[(PropNode, 'downstream_links')] is False
+        assert _accessor_is_method[(MethodNode, 'downstream_links')] is True
+
+    def test_get_links_caches_plain_accessor(self):
+        from victoria.mix import _get_links, _link_getters
+
+        class MethodNode:
+            def upstream_links(self):
+                return ['m']
+
+        assert _get_links(MethodNode(), 'upstream') == ['m']
+        assert (MethodNode, 'upstream') in _link_getters
+        assert _get_links(MethodNode(), 'upstream') == ['m']
+
     def test_round_dict_values(self):
         from victoria.mix import _round_dict_values
         result = _round_dict_values({1: 0.123456789, 2: 0.987654321}, 4)
@@ -540,6 +681,16 @@ class TestModels:
         with pytest.raises(KeyError):
             m.get_link_model('NONEXISTENT')
 
+    def test_intern_pool_scoped_per_instance(self):
+        from victoria.models import Models
+        from victoria.mix import Tank_FIFO
+        net = self._make_network(n_tanks=1)
+        m1, m2 = Models(net), Models(net)
+        assert m1.nodes['J1']._q_pool is m1.nodes['R1']._q_pool is m1._q_pool
+        assert m1._q_pool is not m2._q_pool
+        m1.set_tank_model('T1', Tank_FIFO)
+        assert m1.tanks['T1']._q_pool is m1._q_pool
+
 
 # ---------------------------------------------------------------------------
 # solver.py — _select_fill_solution (static, no mocks needed)
@@ -567,6 +718,17 @@ class TestSolverSelectFillSolution:
         sol = Solver._select_fill_solution([], 0, input_sol)
         assert sol == {99: 1.0}
 
+    def test_fallback_solution_shared_between_links(self):
+        from victoria.solver import Solver
+        input_sol = {0: MagicMock(number=98)}
+        first = Solver._select_fill_solution([], 0, input_sol)
+        assert Solver._select_fill_solution([], 1, input_sol) is first
+
+    def test_no_solution_object_raises(self):
+        from victoria.solver import Solver
+        with pytest.raises(KeyError):
+            Solver._select_fill_solution([], 0, {1: 'not a solution'})
+
 
 # ---------------------------------------------------------------------------
 # solver.py — reset_ready_state
@@ -596,6 +758,169 @@ class TestSolverResetReadyState:
         assert p2_model.ready is False
 
 
+# ---------------------------------------------------------------------------
+# solver.py — topological trace order
+# ---------------------------------------------------------------------------
+
+class TestSolverTopologicalOrder:
+    def _solver(self, up_links, down_links, link_dn):
+        from victoria.solver import Solver
+        network = MagicMock()
+        network.links = []
+        network.nodes = []
+        solver = Solver(MagicMock(), network)
+        solver._up_links   = up_links
+        solver._down_links = down_links
+        solver._link_dn    = {uid: MagicMock(uid=n) for uid, n in link_dn.items()}
+        return solver
+
+    def test_upstream_nodes_come_first(self):
+        # R -> J1 -> J3, R -> J2 -> J3
+        solver = self._solver(
+            up_links={'R': [], 'J1': ['a'], 'J2': ['b'], 'J3': ['c', 'd']},
+            down_links={'R': ['a', 'b'], 'J1': ['c'], 'J2': ['d'], 'J3': []},
+            link_dn={'a': 'J1', 'b': 'J2', 'c': 'J3', 'd': 'J3'},
+        )
+        order = solver._topological_order()
+        assert order[0] == 'R' and order[-1] == 'J3'
+        assert list(solver._trace_order('J2')) == order[order.index('J2'):]
+
+    def test_cycle_nodes_left_out(self):
+        solver = self._solver(
+            up_links={'R': [], 'A': ['r', 'b'], 'B': ['a']},
+            down_links={'R': ['r'], 'A': ['a'], 'B': ['b']},
+            link_dn={'r': 'A', 'a': 'B', 'b': 'A'},
+        )
+        assert solver._topological_order() == ['R']
+        assert list(solver._trace_order('A')) == []
+
+    def test_run_trace_mixes_node_once_all_upstream_ready(self):
+        # R -> J1 -> J3, R -> J2 -> J3
+        solver = self._solver(
+            up_links={'R': [], 'J1': ['a'], 'J2': ['b'], 'J3': ['c', 'd']},
+            down_links={'R': ['a', 'b'], 'J1': ['c'], 'J2': ['d'], 'J3': []},
+            link_dn={'a': 'J1', 'b': 'J2', 'c': 'J3', 'd': 'J3'},
+        )
+        solver._flow = {uid: 1.0 for uid in 'abcd'}
+        solver._node_obj = {uid: MagicMock(uid=uid) for uid in ('R', 'J1', 'J2', 'J3')}
+        solver.models.links = {uid: MagicMock(output_state=[]) for uid in 'abcd'}
+        solver.models.nodes = {uid: MagicMock(outflow=[[], []])
+                               for uid in ('R', 'J1', 'J2', 'J3')}
+        solver.reset_ready_state()
+        assert solver._pending['J3'] == 2
+
+        solver.run_trace(solver._node_obj['R'], 3600, {})
+        assert solver.models.nodes['J3'].mix.call_count == 1
+        assert solver._ready == set('abcd')
+        assert solver._pending['J3'] == 0
+
+        solver.reset_ready_state()
+        assert solver._pending['J3'] == 2
+
+    def test_run_traces_from_several_reservoirs_mixes_each_node_once(self):
+        # R1 -> J1 <- R2, J1 -> J2
+        solver = self._solver(
+            up_links={'R1': [], 'R2': [], 'J1': ['a', 'b'], 'J2': ['c']},
+            down_links={'R1': ['a'], 'R2': ['b'], 'J1': ['c'], 'J2': []},
+            link_dn={'a': 'J1', 'b': 'J1', 'c': 'J2'},
+        )
+        nodes = ('R1', 'R2', 'J1', 'J2')
+        solver._flow = {uid: 1.0 for uid in 'abc'}
+        solver._node_obj = {uid: MagicMock(uid=uid) for uid in nodes}
+        solver.models.links = {uid: MagicMock(output_state=[]) for uid in 'abc'}
+        solver.models.nodes = {uid: MagicMock(outflow=[[]]) for uid in nodes}
+        solver.reset_ready_state()
+
+        solver.run_traces([solver._node_obj['R1'], solver._node_obj['R2']], 3600, {})
+        assert all(solver.models.nodes[uid].mix.call_count == 1 for uid in nodes)
+        assert solver.trace_count == 1
+        assert solver._ready == set('abc')
+
+    def test_fill_network_long_serial_chain(self):
+        # R -> N1 -> N2 -> ... -> N2000, deeper than the recursion limit
+        n = 2000
+        nodes = ['R'] + ['N%d' % i for i in range(1, n + 1)]
+        links = ['L%d' % i for i in range(1, n + 1)]
+        solver = self._solver(
+            up_links={uid: ([links[i - 1]] if i else []) for i, uid in enumerate(nodes)},
+            down_links={uid: ([links[i]] if i < n else []) for i, uid in enumerate(nodes)},
+            link_dn={l_uid: nodes[i + 1] for i, l_uid in enumerate(links)},
+        )
+        from types import SimpleNamespace
+        from victoria.fifo import Pipe
+        solver._node_obj = {uid: SimpleNamespace(uid=uid) for uid in nodes}
+        solver.models.links = {uid: Pipe(volume=1.0) for uid in links}
+        solver.models.nodes = {
+            uid: SimpleNamespace(outflow=[[[1.0, {1: 1.0}]]], mix=lambda *args: None)
+            for uid in nodes
+        }
+        solver.reset_ready_state()
+
+        solver.fill_network(solver._node_obj['R'], {})
+        assert solver.filled_links == set(links)
+        assert solver.models.links['L%d' % n].state[0]['q'] == {1: 1.0}
+
+    def test_junction_mix_has_no_zero_width_parcels(self):
+        # R -> J over two pipes whose outlet edges drift apart by float residue
+        solver = self._solver(
+            up_links={'R': [], 'J': ['a', 'b']},
+            down_links={'R': ['a', 'b'], 'J': []},
+            link_dn={'a': 'J', 'b': 'J'},
+        )
+        from types import SimpleNamespace
+        from victoria.fifo import Pipe, EPS
+        from victoria.mix import Junction
+        junction = Junction()
+        junction._downstream_links = []
+        solver._flow = {'a': 2.7, 'b': 3.1}
+        solver._node_obj = {'R': SimpleNamespace(uid='R'),
+                            'J': SimpleNamespace(uid='J', demand=0.0, _values={})}
+        solver.models.links = {'a': Pipe(volume=1.1), 'b': Pipe(volume=0.9)}
+        for pipe in solver.models.links.values():
+            pipe.fill({3: 1.0})
+        solver.models.nodes = {
+            'R': SimpleNamespace(outflow=[[[1.0, {1: 1.0}]], [[1.0, {2: 1.0}]]],
+                                 mix=lambda *args: None),
+            'J': junction,
+        }
+        for _ in range(6):
+            solver.reset_ready_state()
+            solver.run_trace(solver._node_obj['R'], 300, {})
+            assert junction.mixed_parcels
+            assert all(p['x1'] - p['x0'] >= EPS for p in junction.mixed_parcels)
+            assert junction.mixed_parcels[-1]['x1'] == 1.0
+
+    def test_adjacency_reused_while_flow_pattern_unchanged(self):
+        from victoria.solver import Solver
+        a = MagicMock(uid='A', index=1, _values={})
+        b = MagicMock(uid='B', index=2, _values={})
+        link = MagicMock(uid='P1', index=1, from_node=a, to_node=b, _values={})
+        network = MagicMock()
+        network.links = [link]
+        network.nodes = [a, b]
+        network.tanks = []
+        flows = {8: 2.0, 9: 0.5}
+        network.ep.ENgetlinkvalue.side_effect = lambda idx, code: flows[code]
+        network.ep.ENgetnodevalue.return_value = 0.0
+        models = MagicMock()
+        models.nodes = {}
+        solver = Solver(models, network)
+
+        solver._build_adjacency()
+        up_links = solver._up_links
+        order = solver._topological_order()
+        flows[8] = 3.0                              # same direction
+        solver._build_adjacency()
+        assert solver._up_links is up_links
+        assert solver._topological_order() is order
+        assert solver._flow['P1'] == 3.0
+
+        flows[8] = -3.0                             # reversed
+        solver._build_adjacency()
+        assert solver._up_links == {'A': ['P1'], 'B': []}
+        assert solver._topological_order() == ['B', 'A']
+
+
 # ---------------------------------------------------------------------------
 # solver.py — check_connections (flow reversal detection)
 # ---------------------------------------------------------------------------
@@ -654,6 +979,63 @@ class TestSolverCheckConnections:
         assert p.state[0]['x1'] == pytest.approx(1.0)
 
 
+    def test_only_flipped_links_reversed_after_first_check(self):
+        from victoria.solver import Solver
+        from victoria.fifo import Pipe
+
+        a, b = MagicMock(uid='J1'), MagicMock(uid='J2')
+        network = MagicMock()
+        network.links = [_make_link('P1'), _make_link('P2')]
+        models = MagicMock()
+        models.links = {'P1': Pipe(volume=1.0), 'P2': Pipe(volume=1.0)}
+        solver = Solver(models, network)
+
+        solver._flow    = {'P1': 1.0, 'P2': 1.0}
+        solver._link_up = {'P1': a, 'P2': a}
+        solver._link_dn = {'P1': b, 'P2': b}
+        solver.check_connections()              # first call: orient all links
+
+        solver._flow    = {'P1': 1.0, 'P2': -1.0}
+        solver._link_up = {'P1': a, 'P2': b}
+        solver._link_dn = {'P1': b, 'P2': a}
+        with patch.object(Pipe, 'reverse_parcels', autospec=True) as rev:
+            solver.check_connections()
+        assert rev.call_count == 1
+        assert rev.call_args[0][0] is models.links['P2']
+
+    def test_skipped_while_adjacency_not_rebuilt(self):
+        from victoria.solver import Solver
+        from victoria.fifo import Pipe
+
+        a = MagicMock(uid='A', index=1, _values={})
+        b = MagicMock(uid='B', index=2, _values={})
+        link = MagicMock(uid='P1', index=1, from_node=a, to_node=b, _values={})
+        network = MagicMock()
+        network.links = [link]
+        network.nodes = [a, b]
+        network.tanks = []
+        flows = {8: 2.0, 9: 0.5}
+        network.ep.ENgetlinkvalue.side_effect = lambda idx, code: flows[code]
+        models = MagicMock()
+        models.nodes = {}
+        models.links = {'P1': Pipe(volume=1.0)}
+        solver = Solver(models, network)
+
+        solver._build_adjacency()
+        solver.check_connections()
+        checked = solver._checked_forward
+        flows[8] = 3.0                              # same direction
+        solver._build_adjacency()
+        solver.check_connections()
+        assert solver._checked_forward is checked
+
+        flows[8] = -3.0                             # reversed
+        solver._build_adjacency()
+        with patch.object(Pipe, 'reverse_parcels', autospec=True) as rev:
+            solver.check_connections()
+        assert rev.call_count == 1
+
+
 # ---------------------------------------------------------------------------
 # quality.py — Quality (with mocked PHREEQC and Models)
 # ---------------------------------------------------------------------------
@@ -670,6 +1052,7 @@ class TestQuality:
         phreeqc_sol.pH = 7.0
         phreeqc_sol.sc = 500.0
         phreeqc_sol.temperature = 15.0
+        phreeqc_sol.total.return_value = sol_conc
         pp.get_solution.return_value = phreeqc_sol
         mixed = MagicMock()
         mixed.total.return_value = sol_conc
@@ -720,6 +1103,18 @@ class TestQuality:
         node = self._node_with_parcels(models, q)
         result = quality.get_mixture_node(node)
         assert result == q
+        result[1] = 0.0
+        assert quality.get_mixture_node(node) == q
+
+    def test_get_parcels_returns_copies(self):
+        quality, pp, models = self._make_quality()
+        state = [{'x0': 0.0, 'x1': 1.0, 'q': {1: 1.0}}]
+        models.pipes.get.return_value = MagicMock(state=state)
+        parcels = quality.get_parcels(MagicMock(uid='P1'))
+        assert parcels == state
+        parcels[0]['q'][1] = 0.5
+        parcels[0]['x1'] = 0.5
+        assert state == [{'x0': 0.0, 'x1': 1.0, 'q': {1: 1.0}}]
 
     def test_get_mixture_node_no_model(self):
         quality, pp, models = self._make_quality()
@@ -763,6 +1158,21 @@ class TestQuality:
         # 0.5 * 2.0 + 0.5 * 2.0 = 2.0
         assert result == pytest.approx(2.0)
 
+    def test_batched_queries_match_single_calls(self):
+        quality, pp, models = self._make_quality(sol_conc=3.5)
+        node = self._node_with_parcels(models, {1: 1.0})
+        models.pipes.get.return_value = None
+        concs = quality.get_conc_nodes([node, node], 'Ca', 'mg')
+        assert concs.tolist() == [quality.get_conc_node(node, 'Ca', 'mg')] * 2
+        props = quality.get_properties_nodes(iter([node]))
+        assert props.shape == (1, 3)
+        single = quality.get_properties_node(node)
+        # Breaking change (see CHANGELOG): NodeProperties is a tuple and no
+        # longer compares equal to the list that used to be returned.
+        assert props[0].tolist() != single
+        assert props[0].tolist() == list(single)
+        assert quality.get_conc_pipes_avg([MagicMock(uid='P1')], 'Ca').tolist() == [0.0]
+
     def test_get_properties_node(self):
         quality, pp, models = self._make_quality()
         node = self._node_with_parcels(models, {1: 1.0})
@@ -771,6 +1181,53 @@ class TestQuality:
         assert sc == pytest.approx(500.0)
         assert temp == pytest.approx(15.0)
 
+    def test_get_properties_node_named_fields(self):
+        from victoria import NodeProperties
+        quality, pp, models = self._make_quality()
+        node  = self._node_with_parcels(models, {1: 1.0})
+        props = quality.get_properties_node(node)
+        assert isinstance(props, NodeProperties)
+        assert (props.pH, props.sc, props.temperature) == (7.0, 500.0, 15.0)
+        models.nodes.get.return_value = None
+        assert quality.get_properties_node_avg(node) == (0.0, 0.0, 0.0)
+
+    def test_get_properties_node_avg(self):
+        quality, pp, models = self._make_quality()
+        node = self._node_with_parcels(models, {1: 1.0})
+        models.nodes.get.return_value.mixed_parcels = [
+            {'x0': 0.0, 'x1': 0.5, 'q': {1: 1.0}, 'volume': 1.0},
+            {'x0': 0.5, 'x1': 1.0, 'q': {1: 1.0}, 'volume': 1.0},
+        ]
+        ph, sc, temp = quality.get_properties_node_avg(node)
+        assert ph == pytest.approx(7.0)
+        assert sc == pytest.approx(500.0)
+        assert temp == pytest.approx(15.0)
+
+    def test_get_mixture_node_avg(self):
+        quality, pp, models = self._make_quality()
+        node = self._node_with_parcels(models, {1: 1.0})
+        models.nodes.get.return_value.mixed_parcels = [
+            {'x0': 0.0,  'x1': 0.25, 'q': {1: 1.0},         'volume': 1.0},
+            {'x0': 0.25, 'x1': 1.0,  'q': {1: 0.2, 2: 0.8}, 'volume': 1.0},
+        ]
+        avg = quality.get_mixture_node_avg(node)
+        assert avg == {1: pytest.approx(0.4), 2: pytest.approx(0.6)}
+
+    def test_get_conc_pipe_avg_evaluates_identical_parcels_once(self):
+        quality, pp, models = self._make_quality(sol_conc=2.0)
+        pipe_model = MagicMock()
+        pipe_model.state = [
+            {'x0': 0.0, 'x1': 0.25, 'q': {1: 1.0}},
+            {'x0': 0.25, 'x1': 0.5, 'q': {2: 1.0}},
+            {'x0': 0.5, 'x1': 1.0, 'q': {1: 1.0}},
+        ]
+        models.pipes.get.return_value = pipe_model
+        with patch.object(quality, '_calculate_concentration',
+                          return_value=2.0) as calc:
+            result = quality.get_conc_pipe_avg(MagicMock(uid='P1'), 'Ca', 'mg')
+        assert result == pytest.approx(2.0)
+        assert calc.call_count == 2
+
     def test_mix_phreeqc_solutions_oxygen_convergence_logs_debug(self, caplog):
         """Oxygen convergence errors should be DEBUG, not ERROR."""
         import logging
@@ -823,6 +1280,51 @@ class TestQuality:
         result = quality._mix_phreeqc_solutions({1: 1.0})
         assert result is None
 
+    def test_solution_list_cached_between_mixes(self):
+        quality, pp, models = self._make_quality()
+        quality._mix_phreeqc_solutions({1: 1.0})
+        quality._mix_phreeqc_solutions({1: 0.5, 2: 0.5})
+        assert pp.get_solution_list.call_count == 1
+
+    def test_solution_list_refreshed_for_new_solution(self):
+        quality, pp, models = self._make_quality()
+        quality._mix_phreeqc_solutions({1: 1.0})
+        pp.get_solution_list.return_value = [1, 2, 3]
+        assert quality._mix_phreeqc_solutions({3: 1.0}) is not None
+        assert pp.get_solution_list.call_count == 2
+
+    def test_invalidate_with_known_solutions_skips_list_refresh(self):
+        quality, pp, models = self._make_quality()
+        quality.invalidate_mix_cache(available={1, 2})
+        assert quality._mix_phreeqc_solutions({1: 0.5, 2: 0.5}) is not None
+        pp.get_solution_list.assert_not_called()
+
+    def test_solution_objects_looked_up_once(self):
+        quality, pp, models = self._make_quality()
+        quality._mix_phreeqc_solutions({1: 1.0})
+        quality._mix_phreeqc_solutions({1: 0.5, 2: 0.5})
+        assert pp.get_solution.call_count == 2
+
+    def test_concentration_total_cached_per_element(self):
+        quality, pp, models = self._make_quality()
+        mixed = pp.mix_solutions.return_value
+        q = {1: 0.5, 2: 0.5}
+        quality._calculate_concentration(q, 'Ca', 'mg')
+        quality._calculate_concentration(q, 'Ca', 'mg')
+        quality._calculate_concentration(q, 'Cl', 'mg')
+        assert mixed.total.call_count == 2
+        quality.invalidate_mix_cache()
+        quality._calculate_concentration(q, 'Ca', 'mg')
+        assert mixed.total.call_count == 3
+
+    def test_single_solution_skips_mixing(self):
+        quality, pp, models = self._make_quality(sol_conc=3.5)
+        node = self._node_with_parcels(models, {1: 1.0})
+        assert quality.get_conc_node(node, 'Ca', 'mg') == pytest.approx(3.5)
+        assert quality.get_properties_node(node)[0] == pytest.approx(7.0)
+        pp.mix_solutions.assert_not_called()
+        pp.get_solution.return_value.total.assert_called_once_with('Ca', 'mg')
+
 
 # ---------------------------------------------------------------------------
 # segmentation.py — PipeSegmentation
@@ -913,6 +1415,20 @@ class TestPipeSegmentation:
         assert result[0]['conc'] == pytest.approx(1.0)
         assert result[1]['conc'] == pytest.approx(3.0)
 
+    def test_segment_averages_sweep_matches_dense(self):
+        """The sorted sweep and the overlap matrix give the same result."""
+        import numpy as np
+        from victoria.segmentation import (_segment_averages,
+                                           _segment_averages_dense)
+        px0 = np.array([0.0, 0.1, 0.35, 0.8])
+        px1 = np.array([0.1, 0.35, 0.8, 1.0])
+        vals = np.array([[1.0], [2.0], [3.0], [4.0]])
+        edges = np.linspace(0.0, 1.0, 8)
+        avg, n_ov = _segment_averages(px0, px1, vals, edges[:-1], edges[1:])
+        ref, n_ref = _segment_averages_dense(px0, px1, vals, edges[:-1], edges[1:])
+        assert avg == pytest.approx(ref)
+        assert n_ov.tolist() == n_ref.tolist()
+
     def test_segment_pipe_seg_id_is_one_based(self):
         from victoria.segmentation import PipeSegmentation
         parcels = [{'x0': 0.0, 'x1': 1.0, 'q': 1.0}]
@@ -1061,6 +1577,28 @@ class TestPipeSegmentation:
         df = seg.to_dataframe()
         assert len(df) == 5   # 1 segment × 5 steps
 
+    def test_record_step_reuses_rows_of_unchanged_pipe(self):
+        from victoria.fifo import Pipe
+        from victoria.segmentation import PipeSegmentation
+
+        pipe_model = Pipe(volume=1.0)
+        pipe_model.fill({1: 1.0})
+        model = self._make_model_with_parcels([{'x0': 0.0, 'x1': 1.0, 'q': 2.0}])
+        model.models.pipes = {'P1': pipe_model}
+        seg = PipeSegmentation(model, seg_length_m=10.0)
+
+        network = MagicMock()
+        network.pipes = [self._make_pipe('P1', 20.0)]
+
+        seg.record_step(network, 'Ca', 'mg', step=1)
+        seg.record_step(network, 'Ca', 'mg', step=2)
+        assert model.get_conc_pipe.call_count == 1
+
+        pipe_model.push_pull(0.5, [[0.5, {2: 1.0}]])    # state changes
+        seg.record_step(network, 'Ca', 'mg', step=3)
+        assert model.get_conc_pipe.call_count == 2
+        assert len(seg.to_dataframe()) == 6
+
     # pipe_metadata ---------------------------------------------------------
 
     def test_pipe_metadata_columns(self):
@@ -1125,3 +1663,165 @@ class TestPipeSegmentation:
 
         assert len(result) == 1
         assert result[0]['conc'] == pytest.approx(7.0)
+
+
+# ---------------------------------------------------------------------------
+# victoria.py — garbage_collect
+# ---------------------------------------------------------------------------
+
+class TestVictoriaGarbageCollect:
+    def _victoria(self, solutions):
+        from victoria import Victoria
+        pp = MagicMock()
+        pp.get_solution_list.return_value = solutions
+        return Victoria(MagicMock(), pp), pp
+
+    def test_removes_unused_solutions(self):
+        vic, pp = self._victoria([1, 2, 3])
+        vic.garbage_collect(preserve={2})
+        pp.remove_solutions.assert_called_once_with({1, 3})
+
+    def test_deferred_until_batch_size(self):
+        vic, pp = self._victoria([1, 2, 3])
+        vic.gc_batch_size = 3
+        vic.garbage_collect(preserve={2}, flush=False)
+        pp.remove_solutions.assert_not_called()
+        vic.garbage_collect(flush=False)
+        pp.remove_solutions.assert_called_once_with({1, 2, 3})
+
+    def test_unchanged_references_skip_phreeqc(self):
+        vic, pp = self._victoria([1, 2, 3])
+        vic.garbage_collect(preserve={2}, flush=False)
+        vic.garbage_collect(preserve={2}, flush=False)
+        assert pp.get_solution_list.call_count == 1
+        vic.quality._mix_count += 1          # a new mixture was created
+        vic.garbage_collect(preserve={2}, flush=False)
+        assert pp.get_solution_list.call_count == 2
+        vic.garbage_collect(preserve={2})
+        assert pp.get_solution_list.call_count == 3
+
+
+# ---------------------------------------------------------------------------
+# victoria.py — fill_network
+# ---------------------------------------------------------------------------
+
+class TestVictoriaFillNetwork:
+    def test_default_fill_shares_one_quality_dict(self):
+        from types import SimpleNamespace
+        from victoria import Victoria
+        from victoria.fifo import Pipe
+        vic = Victoria(MagicMock(), MagicMock())
+        vic.solver = MagicMock()
+        vic.solver.models.pipes = {'P1': Pipe(volume=1.0), 'P2': Pipe(volume=2.0)}
+        vic.fill_network({0: SimpleNamespace(number=7)}, from_reservoir=False)
+        q1 = vic.solver.models.pipes['P1'].state[0]['q']
+        q2 = vic.solver.models.pipes['P2'].state[0]['q']
+        assert q1 == {7: 1.0} and q1 is q2
+
+    def test_missing_reservoir_solution_raises_before_filling(self):
+        from types import SimpleNamespace
+        from victoria import Victoria
+        vic = Victoria(MagicMock(), MagicMock())
+        vic.solver = MagicMock()
+        vic.net.reservoirs = [SimpleNamespace(uid='R1'), SimpleNamespace(uid='R2')]
+        with pytest.raises(KeyError):
+            vic.fill_network({'R1': SimpleNamespace(number=1)})
+        vic.solver.fill_network.assert_not_called()
+
+    def test_idle_reservoir_without_solution_is_skipped(self):
+        from types import SimpleNamespace
+        from victoria import Victoria
+        vic = Victoria(MagicMock(), MagicMock())
+        vic.solver = MagicMock()
+        vic.solver._down_links = {'R1': ['P1'], 'R2': []}
+        r1 = SimpleNamespace(uid='R1')
+        vic.net.reservoirs = [r1, SimpleNamespace(uid='R2')]
+        input_sol = {'R1': SimpleNamespace(number=1)}
+        vic.fill_network(input_sol)
+        vic.solver.fill_network.assert_called_once_with(r1, input_sol,
+                                                        fill_timestep=3600.0)
+
+
+# ---------------------------------------------------------------------------
+# victoria.py — quality queries
+# ---------------------------------------------------------------------------
+
+class TestVictoriaQueries:
+    def _victoria(self):
+        from victoria import Victoria
+        vic = Victoria(MagicMock(), MagicMock())
+        vic.solver  = MagicMock()
+        vic.quality = MagicMock()
+        vic.quality.get_mixture_node_avg.return_value = {1: 1.0}
+        vic.quality.get_properties_node.return_value  = [7.0, 500.0, 15.0]
+        return vic
+
+    def test_node_queries_cached_until_step(self):
+        vic  = self._victoria()
+        node = MagicMock(uid='J1')
+        for _ in range(3):
+            assert vic.get_mixture_node_avg(node) == {1: 1.0}
+            assert vic.get_properties_node(node) == [7.0, 500.0, 15.0]
+        assert vic.quality.get_mixture_node_avg.call_count == 1
+        assert vic.quality.get_properties_node.call_count == 1
+        vic.step(60.0, {})
+        vic.get_mixture_node_avg(node)
+        assert vic.quality.get_mixture_node_avg.call_count == 2
+
+    def test_conc_node_avg_cached_per_element_and_units(self):
+        vic  = self._victoria()
+        vic.quality.get_conc_node_avg.side_effect = lambda n, el, u: len(el + u)
+        node = MagicMock(uid='J1')
+        assert vic.get_conc_node_avg(node, 'Ca', 'mg') == 4
+        assert vic.get_conc_node_avg(node, 'Ca', 'mg') == 4
+        assert vic.get_conc_node_avg(node, 'Ca') == 6
+        assert vic.quality.get_conc_node_avg.call_count == 2
+
+    def test_step_many_builds_adjacency_once(self):
+        vic = self._victoria()
+        vic.step_many(3, 60.0, {})
+        assert vic.solver._build_adjacency.call_count == 1
+        assert vic.solver.run_traces.call_count == 3
+        assert vic.solver.reset_ready_state.call_count == 3
+        with pytest.raises(ValueError):
+            vic.step_many(1, 0.0, {})
+
+    def test_cached_results_are_copies(self):
+        vic  = self._victoria()
+        node = MagicMock(uid='J1')
+        vic.get_mixture_node_avg(node)[2] = 0.5
+        assert vic.get_mixture_node_avg(node) == {1: 1.0}
+
+    def test_cache_dropped_after_any_solver_trace(self):
+        vic  = self._victoria()
+        node = MagicMock(uid='J1')
+        vic.solver.trace_count = 0
+        vic.get_mixture_node_avg(node)
+        vic.get_mixture_node_avg(node)
+        assert vic.quality.get_mixture_node_avg.call_count == 1
+        vic.solver.trace_count = 1           # e.g. a direct run_traces() call
+        vic.get_mixture_node_avg(node)
+        assert vic.quality.get_mixture_node_avg.call_count == 2
+
+    def test_cache_ignores_replaced_node_model(self):
+        vic  = self._victoria()
+        node = MagicMock(uid='J1')
+        vic.models.nodes['J1'] = MagicMock()
+        vic.get_properties_node(node)
+        vic.models.nodes['J1'] = MagicMock()  # as Models.set_tank_model does
+        vic.get_properties_node(node)
+        assert vic.quality.get_properties_node.call_count == 2
+        vic.get_properties_node(node)
+        assert vic.quality.get_properties_node.call_count == 2
+        vic.clear_query_cache()
+        vic.get_properties_node(node)
+        assert vic.quality.get_properties_node.call_count == 3
+
+    def test_cached_properties_are_immutable(self):
+        from victoria import NodeProperties
+        vic  = self._victoria()
+        vic.quality.get_properties_node.return_value = NodeProperties(7.0, 500.0, 15.0)
+        node = MagicMock(uid='J1')
+        with pytest.raises(TypeError):
+            vic.get_properties_node(node)[0] = 0.0
+        assert vic.get_properties_node(node) == (7.0, 500.0, 15.0)
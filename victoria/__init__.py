@@ -50,7 +50,7 @@ Example usage:
 from .victoria import Victoria
 from .models import Models
 from .solver import Solver, HydraulicCache
-from .quality import Quality
+from .quality import Quality, NodeProperties
 from .segmentation import PipeSegmentation
 from .fifo import FIFO, Pipe, Pump, Valve
 from .mix import MIX, Junction, Reservoir, Tank_CSTR, Tank_FIFO, Tank_LIFO
@@ -65,6 +65,7 @@ __all__ = [
     'Solver',
     'HydraulicCache',
     'Quality',
+    'NodeProperties',
 
     # Segmentation
     'PipeSegmentation',
@@ -14,15 +14,72 @@ Changes compared to v3:
 from __future__ import annotations
 
 import heapq
-from typing import List, Dict, Any, Optional
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 
 EPS = 1e-10
 
+# Upper bound on the number of distinct quality dicts kept in an intern
+# pool. A pool is simply emptied when it grows past this size; parcels that
+# still hold the old instances keep working, they just lose the identity
+# fast path until the next time their mixture is produced.
+_INTERN_MAX = 100_000
+
 
 # ── Helper functions ──────────────────────────────────────────────────────────
 
-def _merge_adjacent(state: List[Dict[str, Any]],
-                    eps_merge: float) -> List[Dict[str, Any]]:
+def _same_quality(a: Dict[int, float], b: Dict[int, float]) -> bool:
+    """
+    Return True if two quality dicts are equal.
+
+    Parcels downstream of the same source usually share the very same dict
+    object, so the identity test settles most comparisons without walking
+    the dicts.
+    """
+    return a is b or a == b
+
+
+def _intern_q(q: Dict[int, float],
+              pool: Dict[frozenset, Dict[int, float]]) -> Dict[int, float]:
+    """
+    Return the canonical instance of a quality dict within pool.
+
+    Mixtures produced from the same upstream composition come out as equal
+    but distinct dicts. Interning them lets _same_quality and the per-call
+    lookups in Quality resolve on identity instead of walking the dicts.
+    The pool belongs to one Models instance (see MIX._q_pool), so interned
+    dicts are only shared within one network and must not be modified in
+    place.
+    """
+    key = frozenset(q.items())
+    canonical = pool.get(key)
+    if canonical is None:
+        if len(pool) >= _INTERN_MAX:
+            pool.clear()
+        canonical = pool[key] = q
+    return canonical
+
+
+_get_bounds = itemgetter('x0', 'x1')
+
+
+def _parcel_bounds(parcels: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the x0 and x1 positions of a parcel list as two float64 columns.
+
+    Both keys are read in a single pass (itemgetter runs in C); callers that
+    reduce over positions work on these columns instead of on the dicts.
+    """
+    if not parcels:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty
+    bounds = np.array(list(map(_get_bounds, parcels)), dtype=np.float64)
+    return bounds[:, 0], bounds[:, 1]
+
+
+def _merge_adjacent(state: List[Dict[str, Any]], eps_merge: float,
+                    in_place: bool = False) -> List[Dict[str, Any]]:
     """
     Merge adjacent parcels whose quality values all lie within eps_merge
     of each other.
@@ -30,12 +87,19 @@ def _merge_adjacent(state: List[Dict[str, Any]],
     Works for both pipe.state (no 'volume' key) and mixed_parcels (with
     'volume' key): the weight is p['volume'] if present, otherwise the
     width fraction (x1 - x0).
+
+    With in_place=True the parcel dicts of *state* are reused and the
+    surviving ones updated directly; callers that own the parcels (a
+    pipe's own state, freshly mixed node parcels) skip one dict copy per
+    parcel per step this way.
     """
     if len(state) <= 1:
         return state
 
-    merged = [dict(state[0])]
-    merged[-1]['q'] = dict(state[0]['q'])
+    # Quality dicts are never modified in place (merging assigns a new
+    # dict), so they are shared with the input rather than copied.
+    copy   = (lambda p: p) if in_place else dict
+    merged = [copy(state[0])]
 
     for p in state[1:]:
         prev     = merged[-1]
@@ -58,13 +122,22 @@ def _merge_adjacent(state: List[Dict[str, Any]],
             if 'volume' in prev and 'volume' in p:
                 prev['volume'] = w_tot
         else:
-            new_p = dict(p)
-            new_p['q'] = dict(p['q'])
-            merged.append(new_p)
+            merged.append(copy(p))
 
     return merged
 
 
+def _snap_edges(parcel: Dict[str, Any]) -> Tuple[float, float]:
+    """Snap x0/x1 of a parcel within EPS of the pipe ends onto 0 or 1."""
+    x0, x1 = parcel['x0'], parcel['x1']
+    if abs(x0) < EPS: x0 = 0.0
+    if abs(x1) < EPS: x1 = 0.0
+    if abs(x0 - 1) < EPS: x0 = 1.0
+    if abs(x1 - 1) < EPS: x1 = 1.0
+    parcel['x0'], parcel['x1'] = x0, x1
+    return x0, x1
+
+
 def _parcel_diff(a: Dict[str, Any], b: Dict[str, Any]) -> float:
     """Maximum quality difference between two adjacent parcels."""
     all_keys = set(a['q']) | set(b['q'])
@@ -94,9 +167,9 @@ def _enforce_max_parcels(state: List[Dict[str, Any]],
     prev = list(range(-1, n - 1))   # prev[i] = previous live index
     nxt  = list(range(1, n + 1))    # nxt[i]  = next live index (n = sentinel)
 
-    parcels = [dict(p) for p in state]
-    for p in parcels:
-        p['q'] = dict(p['q'])
+    # Merged parcels are new dicts and the input parcels are only read,
+    # so a shallow copy of the list is enough.
+    parcels = list(state)
 
     # Heap: (diff, i, j) where i and j are adjacent indices
     heap: list = []
@@ -161,6 +234,52 @@ def _enforce_max_parcels(state: List[Dict[str, Any]],
     return result
 
 
+# ── Parcel ────────────────────────────────────────────────────────────────────
+
+class Parcel:
+    """
+    A water parcel as a compact record: position [x0, x1] as fractions of
+    the link length, quality q (solution number -> fraction) and, for node
+    parcels, the volume.
+
+    The models keep their parcels as plain dicts (state, output_state and
+    mixed_parcels are public in that form). Parcel converts to and from
+    that format for callers that store many parcels; with __slots__ it
+    has no per-instance __dict__.
+    """
+
+    __slots__ = ('x0', 'x1', 'q', 'volume')
+
+    def __init__(self, x0: float, x1: float, q: Dict[int, float],
+                 volume: Optional[float] = None):
+        self.x0     = x0
+        self.x1     = x1
+        self.q      = q
+        self.volume = volume
+
+    @classmethod
+    def from_dict(cls, parcel: Dict[str, Any]) -> 'Parcel':
+        return cls(parcel['x0'], parcel['x1'], parcel['q'], parcel.get('volume'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {'x0': self.x0, 'x1': self.x1, 'q': self.q}
+        if self.volume is not None:
+            d['volume'] = self.volume
+        return d
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Parcel):
+            return NotImplemented
+        return (self.x0, self.x1, self.q, self.volume) == \
+               (other.x0, other.x1, other.q, other.volume)
+
+    __hash__ = None   # mutable record, like the dict form
+
+    def __repr__(self) -> str:
+        return (f"Parcel(x0={self.x0!r}, x1={self.x1!r}, q={self.q!r}"
+                + (f", volume={self.volume!r})" if self.volume is not None else ")"))
+
+
 # ── Base class ────────────────────────────────────────────────────────────────
 
 class FIFO:
@@ -173,6 +292,9 @@ class FIFO:
         self.downstream_node: Optional[Any] = None
         self.upstream_node:   Optional[Any] = None
         self._offset: float = 0.0
+        # Bumped on every change to state; lets consumers such as
+        # PipeSegmentation reuse results computed for an unchanged pipe.
+        self.state_version: int = 0
 
     def connections(self, downstream: Any, upstream: Any) -> None:
         self.downstream_node = downstream
@@ -194,6 +316,7 @@ class FIFO:
              for p in self.state],
             key=lambda p: p['x1']
         )
+        self.state_version  += 1
         self.downstream_node = downstream
         self.upstream_node   = upstream
 
@@ -209,6 +332,7 @@ class FIFO:
         """
         if self.volume <= 0:
             return
+        self.state_version += 1
         while volumes:
             v, q = volumes.pop()
             if v <= 0:
@@ -221,7 +345,7 @@ class FIFO:
             # Merge with the existing first parcel if quality matches
             # and the new parcel's x1 is adjacent to the first parcel's x0.
             if (self.state and
-                    self.state[0]['q'] == q and
+                    _same_quality(self.state[0]['q'], q) and
                     abs((self.state[0]['x0'] + self._offset) - fraction) < EPS):
                 self.state[0]['x0'] = new_x0
             else:
@@ -254,16 +378,25 @@ class Pipe(FIFO):
 
         self._materialize()
 
-        new_state = []
+        # The state runs from the inlet (x = 0) to the outlet (x = 1) with
+        # non-decreasing positions. Only a head of parcels can lie within
+        # EPS of the inlet and only a tail can reach the outlet; the parcels
+        # in between need no snapping and stay in the pipe untouched.
+        state = self.state
+        n     = len(state)
+        hi    = n
+        while hi > 0 and state[hi - 1]['x1'] > 1 - EPS:
+            hi -= 1
+        lo = 0
+        while lo < hi and state[lo]['x0'] < EPS:
+            _snap_edges(state[lo])
+            lo += 1
+
+        new_state = state[:hi]
         output    = []
 
-        for parcel in self.state:
-            x0, x1 = parcel['x0'], parcel['x1']
-            if abs(x0) < EPS: x0 = 0.0
-            if abs(x1) < EPS: x1 = 0.0
-            if abs(x0 - 1) < EPS: x0 = 1.0
-            if abs(x1 - 1) < EPS: x1 = 1.0
-            parcel['x0'], parcel['x1'] = x0, x1
+        for parcel in state[hi:]:
+            x0, x1 = _snap_edges(parcel)
 
             if x1 > 1:
                 vol = (x1 - max(1.0, x0)) * self.volume
@@ -277,11 +410,12 @@ class Pipe(FIFO):
 
         # ── Parcel merging on the remaining state ─────────────────────────────
         if len(new_state) > 1:
-            new_state = _merge_adjacent(new_state, self.eps_merge)
+            new_state = _merge_adjacent(new_state, self.eps_merge, in_place=True)
         if len(new_state) > self.max_parcels:
             new_state = _enforce_max_parcels(new_state, self.max_parcels)
 
-        self.state = new_state
+        self.state          = new_state
+        self.state_version += 1
 
         # Build output_state
         if output:
@@ -290,7 +424,7 @@ class Pipe(FIFO):
                 x0 = 0.0
                 for v, q in output:
                     x1 = x0 + v / total_out
-                    if self.output_state and self.output_state[-1]['q'] == q:
+                    if self.output_state and _same_quality(self.output_state[-1]['q'], q):
                         self.output_state[-1]['x1'] = x1
                     else:
                         self.output_state.append({
@@ -298,12 +432,15 @@ class Pipe(FIFO):
                             'q': q, 'volume': total_out
                         })
                     x0 = x1
+                # The running sum can end at 1 ± 1 ulp; pin the outlet edge
+                self.output_state[-1]['x1'] = 1.0
 
         self.ready = True
 
     def fill(self, input_sol: Dict[int, float]) -> None:
         self._offset = 0.0
         self.state        = [{'x0': 0.0, 'x1': 1.0, 'q': input_sol}]
+        self.state_version += 1
         self.output_state = [{'x0': 0.0, 'x1': 1.0, 'q': input_sol,
                                'volume': self.volume}]
 
@@ -322,7 +459,7 @@ class ZeroLengthFIFO(FIFO):
         x0 = 0.0
         for v, q in volumes:
             x1 = x0 + v / total_volume
-            if self.output_state and self.output_state[-1]['q'] == q:
+            if self.output_state and _same_quality(self.output_state[-1]['q'], q):
                 self.output_state[-1]['x1'] = x1
             else:
                 self.output_state.append({'x0': x0, 'x1': x1,
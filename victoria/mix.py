@@ -18,15 +18,18 @@ Changes compared to v4:
 
 from __future__ import annotations
 
-from typing import List, Dict, Any
+from collections import deque
+from typing import List, Dict, Any, Callable, Deque, Optional, Tuple
+from inspect import isfunction
 from math import exp
+from operator import attrgetter, methodcaller
 import logging
 import numpy as np
 
 try:
-    from .fifo import _merge_adjacent, _enforce_max_parcels
+    from .fifo import _merge_adjacent, _enforce_max_parcels, _same_quality, _intern_q, _parcel_bounds, EPS
 except ImportError:
-    from fifo import _merge_adjacent, _enforce_max_parcels
+    from fifo import _merge_adjacent, _enforce_max_parcels, _same_quality, _intern_q, _parcel_bounds, EPS
 
 logger = logging.getLogger(__name__)
 
@@ -35,19 +38,84 @@ _EPS_MERGE  = 0.005   # default 0.5% quality difference
 _MAX_PARCEL = 50      # default max parcels per node output
 
 
-def _get_links(node: Any, direction: str) -> list:
-    attr  = f'{direction}_links'
-    links = getattr(node, attr, [])
-    return links() if callable(links) else links
+# (type, attribute) -> True if the class defines the attribute as a method,
+# False if it is a property; unknown layouts are not cached and fall back
+# to the per-call callable() check.
+_accessor_is_method: Dict[Tuple[type, str], bool] = {}
+_MISSING = object()
+
+
+def _get_attr_value(obj: Any, attr: str, default: Any = _MISSING) -> Any:
+    """
+    Return obj.attr, calling it if the attribute is a method.
+
+    EPyNet exposes some attributes as methods in one version and as
+    properties in another. The decision is made once per class instead of
+    with a callable() check on every call. Without a default a missing
+    attribute raises AttributeError, like getattr().
+    """
+    key       = (type(obj), attr)
+    is_method = _accessor_is_method.get(key)
+    if is_method is None:
+        cls_attr = getattr(key[0], attr, None)
+        if isinstance(cls_attr, property):
+            is_method = _accessor_is_method[key] = False
+        elif isfunction(cls_attr):
+            is_method = _accessor_is_method[key] = True
+        else:
+            value = (getattr(obj, attr) if default is _MISSING
+                     else getattr(obj, attr, default))
+            return value() if callable(value) else value
+    if is_method:
+        return getattr(obj, attr)()
+    if default is _MISSING:
+        return getattr(obj, attr)
+    return getattr(obj, attr, default)
+
+
+_LINK_ATTR = {'upstream': 'upstream_links', 'downstream': 'downstream_links'}
 
 
-def _node_outflow(node: Any) -> float:
+# (type, direction) -> plain accessor returning the node's link list, built
+# once the class layout of the link attribute is known.
+_link_getters: Dict[Tuple[type, str], Callable[[Any], list]] = {}
+
+
+def _get_links(node: Any, direction: str) -> list:
+    getter = _link_getters.get((type(node), direction))
+    if getter is not None:
+        return getter(node)
+    attr  = _LINK_ATTR.get(direction) or f'{direction}_links'
+    links = _get_attr_value(node, attr, [])
+    is_method = _accessor_is_method.get((type(node), attr))
+    if is_method is not None:
+        _link_getters[(type(node), direction)] = (
+            methodcaller(attr) if is_method else attrgetter(attr))
+    return links
+
+
+def _node_outflow(node: Any, flows_out: Optional[np.ndarray] = None) -> float:
+    """
+    Total outflow of *node*. Uses the solver's cached value if present,
+    otherwise the already-read downstream flows, and only as a last resort
+    queries link.flow again.
+    """
     cached = getattr(node, '_cached_outflow', None)
     if cached is not None:
         return cached
+    if flows_out is not None:
+        return float(flows_out.sum())
     return sum(abs(link.flow) for link in _get_links(node, 'downstream'))
 
 
+def _round_dict_values(d: Dict[Any, float], ndigits: int = _ROUND) -> Dict[Any, float]:
+    """Round all values of *d* in one vectorised np.round call."""
+    if not d:
+        return {}
+    vals = np.round(np.fromiter(d.values(), dtype=np.float64, count=len(d)), ndigits)
+    return dict(zip(d.keys(), vals.tolist()))
+
+
 def _node_volume(node: Any) -> float:
     cached = node._values.get(24, None)
     if cached is not None:
@@ -67,24 +135,82 @@ class MIX:
         self.outflow:        List[List[List[Any]]] = []
         self.mixed_parcels:  List[Dict[str, Any]]  = []
 
+        # Downstream link objects for the current hydraulic step, set by
+        # Solver._build_adjacency(). None means: resolve via the node.
+        self._downstream_links: Optional[List[Any]] = None
+        self._flow_buf: np.ndarray = np.empty(0, dtype=np.float64)
+
+        # Intern pool for the mixtures this model produces. Models replaces
+        # it with one pool shared by all node models of the same network.
+        self._q_pool: Dict[frozenset, Dict[int, float]] = {}
+
+    @staticmethod
+    def add_load(acc: Dict, add: Dict, volume: float) -> None:
+        """In-place variant of merge_load(): accumulate add * volume into acc."""
+        for key, v in add.items():
+            acc[key] = acc.get(key, 0) + v * volume
+
     @staticmethod
     def merge_load(existing: Dict, add: Dict, volume: float) -> Dict:
         result = existing.copy()
-        for key, v in add.items():
-            result[key] = result.get(key, 0) + v * volume
+        MIX.add_load(result, add, volume)
         return result
 
+    def _read_flows(self, node: Any) -> np.ndarray:
+        """
+        Return abs(link.flow) of every downstream link of *node*.
+
+        Uses the link list pre-resolved by the solver when available and
+        writes into a buffer that is reused across calls, so the returned
+        array is only valid until the next _read_flows() call.
+        """
+        links = self._downstream_links
+        if links is None:
+            links = _get_links(node, 'downstream')
+        n = len(links)
+        if len(self._flow_buf) < n:
+            self._flow_buf = np.empty(n, dtype=np.float64)
+        buf = self._flow_buf[:n]
+        for i, link in enumerate(links):
+            buf[i] = abs(link.flow)
+        return buf
+
+    def _reset_output(self) -> None:
+        """
+        Empty mixed_parcels and outflow in place.
+
+        The list objects live as long as the model, so every mix() call
+        refills the same containers instead of allocating new ones.
+        """
+        self.mixed_parcels.clear()
+        self.outflow.clear()
+
     def parcels_out(self, flows_out: List[float]) -> None:
-        self.outflow = []
-        total_flow = sum(flows_out)
+        outflow = self.outflow
+        outflow.clear()
+        flows      = np.asarray(flows_out, dtype=np.float64)
+        total_flow = float(flows.sum())
         if total_flow <= 1e-7:
             return
-        for flow in flows_out:
-            ratio = flow / total_flow
-            self.outflow.append([
-                [((p['x1'] - p['x0']) * ratio * p['volume']), p['q']]
-                for p in self.mixed_parcels
+        parcels = self.mixed_parcels
+        if len(flows) == 1:
+            # Single outgoing link (most junctions): the ratio is 1, so the
+            # outer product and its array round-trip are not needed.
+            outflow.append([
+                [(p['x1'] - p['x0']) * p['volume'], p['q']] for p in parcels
             ])
+            return
+        n = len(parcels)
+        # Parcel volumes once, then one outer product for all links:
+        # vols[k, i] = (x1 - x0) * volume of parcel i * ratio of link k
+        pvol = np.fromiter(((p['x1'] - p['x0']) * p['volume'] for p in parcels),
+                           dtype=np.float64, count=n)
+        vols = np.multiply.outer(flows / total_flow, pvol)
+        qs   = [p['q'] for p in parcels]
+        outflow.extend(
+            [[v, q] for v, q in zip(row, qs)]
+            for row in vols.tolist()
+        )
 
 
 # ── Junction ──────────────────────────────────────────────────────────────────
@@ -94,70 +220,109 @@ class Junction(MIX):
     Junction node — O(n log n) sweep + numpy-vectorised overlap + parcel merging.
 
     The boundary sweep is O(n log n) in the number of boundary points.
-    Within each cell, the overlap of every parcel is computed in one
-    vectorised numpy operation instead of a Python for-loop, giving a
-    ~3–5× speed-up for junctions with many incoming parcels.
+    The overlap of every cell with every parcel is computed as one
+    (n_cells × n_parcels) numpy operation instead of a Python loop.
 
-    Quality accumulation (mixture dict) still runs in Python because
-    parcel quality is a sparse dict; only the parcels that actually
-    overlap the cell (mask=True) are iterated — already the minimum work.
+    Quality accumulation uses a dense (n_parcels × n_solutions) matrix
+    built from the sparse quality dicts, so the load per cell is a single
+    matrix product; only the final per-cell mixture dicts are built in
+    Python.
     """
 
     def mix(self, inflow: List[Dict[str, Any]], node: Any,
             timestep: float, input_sol: Any) -> None:
-        self.mixed_parcels = []
+        self._reset_output()
         if not inflow:
             return
 
-        demand  = round(node.demand / 3600 * timestep, 7)
-        parcels = sorted(inflow, key=lambda p: p['x1'])
+        demand = round(node.demand / 3600 * timestep, 7)
+        n      = len(inflow)
+
+        if n == 1 and inflow[0]['x0'] >= 0:
+            # A single incoming parcel forms exactly one cell: no sweep,
+            # no overlap matrix and nothing to merge.
+            p = inflow[0]
+            if (p['x1'] - p['x0']) * p['volume'] > 0:
+                self.mixed_parcels.append({
+                    'x0': float(p['x0']), 'x1': float(p['x1']),
+                    'q':  _intern_q(_round_dict_values(p['q']), self._q_pool),
+                    'volume': max(0.0, p['volume'] - demand),
+                })
+            self.parcels_out(self._read_flows(node))
+            return
 
         # ── Build arrays once for the whole mix() call ────────────────────────
-        px0  = np.fromiter((p['x0']    for p in parcels), dtype=np.float64, count=len(parcels))
-        px1  = np.fromiter((p['x1']    for p in parcels), dtype=np.float64, count=len(parcels))
-        pvol = np.fromiter((p['volume'] for p in parcels), dtype=np.float64, count=len(parcels))
+        # Sorting happens on the x1 array (argsort) instead of on the list of
+        # dicts; the permutation is then applied to every column at once.
+        px0, px1 = _parcel_bounds(inflow)
+        pvol = np.fromiter((p['volume'] for p in inflow), dtype=np.float64, count=n)
 
-        boundaries = np.unique(np.concatenate(([0.0], px0, px1)))
+        order = np.argsort(px1, kind='stable')
+        px0   = px0[order]
+        px1   = px1[order]
+        pvol  = pvol[order]
+        pq    = [inflow[j]['q'] for j in order]
 
-        for i in range(len(boundaries) - 1):
-            x_lo = boundaries[i]
-            x_hi = boundaries[i + 1]
-            if x_hi <= x_lo:
-                continue
-
-            # Vectorised overlap: (min(x_hi, px1) - max(x_lo, px0)) * pvol
-            raw_ov = (np.minimum(x_hi, px1) - np.maximum(x_lo, px0)) * pvol
-            mask   = raw_ov > 0
-            if not mask.any():
-                continue
-
-            cell_volume = float(raw_ov[mask].sum())
-            total_vol   = float(pvol[mask].sum())
-            if cell_volume <= 0:
-                continue
-
-            # Quality accumulation — only over parcels in this cell
-            mixture = {}
-            inv_cv  = 1.0 / cell_volume
-            for j in np.where(mask)[0]:
-                w = float(raw_ov[j])
-                for key, val in parcels[j]['q'].items():
-                    mixture[key] = mixture.get(key, 0.0) + val * w
-            mixture = {k: round(v * inv_cv, _ROUND) for k, v in mixture.items()}
+        boundaries = np.unique(np.concatenate(([0.0], px0, px1)))
+        # Edges that differ only by float residue (e.g. 1.0 and
+        # 0.9999999999999999 from two upstream pipes) would form zero-width
+        # cells carrying a full-step volume; collapse them into one edge.
+        keep = np.concatenate(([True], np.diff(boundaries) >= EPS))
+        if not keep.all():
+            last       = boundaries[-1]
+            boundaries = boundaries[keep]
+            boundaries[-1] = last
+        x_lo = boundaries[:-1]
+        x_hi = boundaries[1:]
+
+        # ── Overlap of every cell with every parcel: shape (n_cells, n) ───────
+        raw_ov = (np.minimum(x_hi[:, None], px1[None, :]) -
+                  np.maximum(x_lo[:, None], px0[None, :])) * pvol[None, :]
+        mask   = raw_ov > 0
+        raw_ov = np.where(mask, raw_ov, 0.0)
+
+        cell_volume = raw_ov.sum(axis=1)
+        total_vol   = (mask * pvol[None, :]).sum(axis=1)
+
+        # ── Dense (n × n_keys) quality matrix over the solutions present ─────
+        key_idx: Dict[Any, int] = {}
+        for q in pq:
+            for key in q:
+                if key not in key_idx:
+                    key_idx[key] = len(key_idx)
+        keys    = list(key_idx)
+        q_val   = np.zeros((n, len(keys)), dtype=np.float64)
+        q_mask  = np.zeros((n, len(keys)), dtype=bool)
+        for j, q in enumerate(pq):
+            for key, val in q.items():
+                q_val[j, key_idx[key]]  = val
+                q_mask[j, key_idx[key]] = True
+
+        load    = raw_ov @ q_val                   # (n_cells, n_keys)
+        present = (mask.astype(np.float64) @ q_mask) > 0
+
+        cells = np.flatnonzero(cell_volume > 0)
+        conc  = np.round(load[cells] / cell_volume[cells, None], _ROUND).tolist()
+
+        for row, i in zip(conc, cells):
+            mixture = _intern_q({keys[k]: row[k] for k in np.flatnonzero(present[i])},
+                                self._q_pool)
 
             self.mixed_parcels.append({
-                'x0': float(x_lo), 'x1': float(x_hi),
+                'x0': float(x_lo[i]), 'x1': float(x_hi[i]),
                 'q':  mixture,
-                'volume': max(0.0, total_vol - demand),
+                'volume': max(0.0, float(total_vol[i]) - demand),
             })
 
         # ── Parcel merging on output ──────────────────────────────────────────
-        if len(self.mixed_parcels) > 1:
-            self.mixed_parcels = _merge_adjacent(self.mixed_parcels, self.eps_merge)
-        if len(self.mixed_parcels) > self.max_parcels:
-            self.mixed_parcels = _enforce_max_parcels(self.mixed_parcels, self.max_parcels)
-
-        flows_out = [abs(link.flow) for link in _get_links(node, 'downstream')]
+        # Results are written back into the same list (see _reset_output).
+        mixed = self.mixed_parcels
+        if len(mixed) > 1:
+            mixed[:] = _merge_adjacent(mixed, self.eps_merge, in_place=True)
+        if len(mixed) > self.max_parcels:
+            mixed[:] = _enforce_max_parcels(mixed, self.max_parcels)
+
+        flows_out = self._read_flows(node)
         self.parcels_out(flows_out)
 
 
@@ -175,24 +340,24 @@ class Reservoir(MIX):
 
     def mix(self, inflow: List[Dict[str, Any]], node: Any,
             timestep: float, input_sol: Dict) -> None:
-        self.mixed_parcels = []
+        self._reset_output()
 
-        if inflow:
+        if inflow and logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 "Reservoir '%s' received %d inflow parcels — discarded "
                 "(possible backflow).", node.uid, len(inflow)
             )
 
-        q            = {input_sol[node.uid].number: 1.0}
-        outflow      = _node_outflow(node)
+        q            = _intern_q({input_sol[node.uid].number: 1.0}, self._q_pool)
+        flows_out    = self._read_flows(node)
+        outflow      = _node_outflow(node, flows_out)
         shift_volume = timestep * outflow / 3600
         self.mixed_parcels.append({'x0': 0.0, 'x1': 1.0, 'q': q,
                                     'volume': shift_volume})
-        flows_out = [abs(link.flow) for link in _get_links(node, 'downstream')]
-        if flows_out:
+        if len(flows_out):
             self.parcels_out(flows_out)
         else:
-            self.outflow = [[[shift_volume, q]]]
+            self.outflow.append([[shift_volume, q]])
 
 
 # ── Tank_CSTR ─────────────────────────────────────────────────────────────────
@@ -206,33 +371,38 @@ class Tank_CSTR(MIX):
 
     def mix(self, inflow: List[Dict[str, Any]], node: Any,
             timestep: float, input_sol: Any) -> None:
-        self.mixed_parcels = []
+        self._reset_output()
         volume_tank  = _node_volume(node)
         mixture      = {}
         total_volume = 0.0
 
+        # Accumulate in place — one dict for all inflow parcels
         for p in inflow:
             rv = (p['x1'] - p['x0']) * p['volume']
-            mixture = self.merge_load(mixture, p['q'], rv)
+            self.add_load(mixture, p['q'], rv)
             total_volume += rv
 
         if total_volume > 0:
             inv = 1.0 / total_volume
-            mixture = {k: round(v * inv, _ROUND) for k, v in mixture.items()}
+            mixture = _intern_q(_round_dict_values({k: v * inv for k, v in mixture.items()}),
+                                self._q_pool)
 
+        flows_out  = self._read_flows(node)
         frac       = 1.0 if volume_tank <= 0 else 1 - exp(-total_volume / volume_tank)
-        volume_out = _node_outflow(node) / 3600 * timestep
+        volume_out = _node_outflow(node, flows_out) / 3600 * timestep
 
-        new_solution = self.merge_load({}, mixture, frac)
-        new_solution = self.merge_load(new_solution, self.mixture, 1 - frac)
-        solution_out = self.merge_load({}, self.mixture, 0.5)
-        solution_out = self.merge_load(solution_out, new_solution, 0.5)
+        new_solution: Dict = {}
+        self.add_load(new_solution, mixture, frac)
+        self.add_load(new_solution, self.mixture, 1 - frac)
+        # 0.5 * self.mixture + 0.5 * new_solution, expanded into one pass
+        solution_out: Dict = {}
+        self.add_load(solution_out, self.mixture, 1 - 0.5 * frac)
+        self.add_load(solution_out, mixture, 0.5 * frac)
 
         self.mixed_parcels.append({'x0': 0.0, 'x1': 1.0,
                                     'q': solution_out, 'volume': volume_out})
         self.mixture = new_solution
 
-        flows_out = [abs(link.flow) for link in _get_links(node, 'downstream')]
         self.parcels_out(flows_out)
 
 
@@ -251,7 +421,7 @@ class Tank_LIFO(MIX):
     def __init__(self, maxvolume: float):
         super().__init__()
         self.maxvolume = maxvolume
-        self.state: List[Dict[str, Any]] = []
+        self.state: Deque[Dict[str, Any]] = deque()
 
     def _shift_state(self, shift: float) -> None:
         for s in self.state:
@@ -260,33 +430,29 @@ class Tank_LIFO(MIX):
 
     def mix(self, inflow: List[Dict[str, Any]], node: Any,
             timestep: float, input_sol: Any) -> None:
-        self.mixed_parcels = []
-        downstream_links = _get_links(node, 'downstream')
+        self._reset_output()
+        flows_out = self._read_flows(node)
 
-        if not downstream_links:
+        if not len(flows_out):
             for p in inflow:
                 volume = (p['x1'] - p['x0']) * p['volume']
                 shift  = volume / self.maxvolume if self.maxvolume > 0 else 0
                 self._shift_state(shift)
-                if self.state and p['q'] == self.state[0]['q']:
+                if self.state and _same_quality(p['q'], self.state[0]['q']):
                     self.state[0]['x0'] = 0
                 else:
-                    self.state = [{'x0': 0.0, 'x1': shift, 'q': p['q']}] + self.state
+                    self.state.appendleft({'x0': 0.0, 'x1': shift, 'q': p['q']})
             return
 
         # ── Fix: abs() on link.flow ───────────────────────────────────────────
-        total_outflow = sum(abs(link.flow) for link in downstream_links)
+        total_outflow = float(flows_out.sum())
 
         if total_outflow > 0:
-            flows_out = [abs(link.flow) for link in downstream_links]
-            vol_out   = sum(flows_out) / 3600 * timestep
+            vol_out   = total_outflow / 3600 * timestep
             shift     = vol_out / self.maxvolume if self.maxvolume > 0 else 0
-            self.state = [
-                {'x0': s['x0'] - shift, 'x1': s['x1'] - shift, 'q': s['q']}
-                for s in self.state
-            ]
+            self._shift_state(-shift)
             xcure = 1.0
-            new_state = []
+            new_state: Deque[Dict[str, Any]] = deque()
             for p in self.state:
                 x0, x1 = p['x0'], p['x1']
                 if x1 > 0:
@@ -316,50 +482,52 @@ class Tank_FIFO(MIX):
         super().__init__()
         self.volume = volume
         self.volume_prev = volume
-        self.state: List[Dict[str, Any]] = []
+        self.state: Deque[Dict[str, Any]] = deque()
 
     def _shift_and_scale_state(self, shift: float, factor: float) -> None:
-        self.state = [
-            {'x0': s['x0'] * factor + shift,
-             'x1': s['x1'] * factor + shift,
-             'q':  s['q']}
-            for s in self.state
-        ]
+        for s in self.state:
+            s['x0'] = s['x0'] * factor + shift
+            s['x1'] = s['x1'] * factor + shift
 
     def mix(self, inflow: List[Dict[str, Any]], node: Any,
             timestep: float, input_sol: Any) -> None:
+        self._reset_output()
         factor = self.volume_prev / self.volume if self.volume > 0 else 1.0
         for p in inflow:
             volume = (p['x1'] - p['x0']) * p['volume']
             shift  = volume / self.volume if self.volume > 0 else 0
             self._shift_and_scale_state(shift, factor)
-            if self.state and p['q'] == self.state[0]['q']:
+            if self.state and _same_quality(p['q'], self.state[0]['q']):
                 self.state[0]['x0'] = 0
             else:
-                self.state = [{'x0': 0.0, 'x1': shift, 'q': p['q']}] + self.state
+                self.state.appendleft({'x0': 0.0, 'x1': shift, 'q': p['q']})
         self.volume_prev = self.volume
 
-        downstream_links = _get_links(node, 'downstream')
-        flows_out = [abs(link.flow) for link in downstream_links]
-        vol_out   = sum(flows_out) / 3600 * timestep
-        x0_out    = 0.0
-        new_state = []
-        output    = []
-
-        for p in self.state:
-            x0, x1 = p['x0'], p['x1']
-            if x1 > 1:
-                out_vol = (x1 - max(1, x0)) * self.volume
-                x1_out  = x0_out + out_vol / vol_out if vol_out > 0 else x0_out
-                output.append({'x0': x0_out, 'x1': x1_out,
-                                'q': p['q'], 'volume': vol_out})
-                x0_out = x1_out
-            if x0 < 1:
+        flows_out = self._read_flows(node)
+        vol_out   = float(flows_out.sum()) / 3600 * timestep
+
+        # ── Outflow sweep over parcel arrays ──────────────────────────────────
+        # Parcels reaching past x=1 leave the tank; their outlet positions are
+        # the running sum of their relative outflow volumes.
+        parcels  = list(self.state)
+        px0, px1 = _parcel_bounds(parcels)
+
+        out_idx = np.flatnonzero(px1 > 1)
+        if vol_out > 0:
+            out_vol = (px1[out_idx] - np.maximum(1.0, px0[out_idx])) * self.volume
+            widths  = out_vol / vol_out
+        else:
+            widths  = np.zeros(len(out_idx), dtype=np.float64)
+        edges = np.concatenate(([0.0], np.cumsum(widths))).tolist()
+
+        self.mixed_parcels.extend(
+            {'x0': edges[k], 'x1': edges[k + 1],
+             'q': parcels[i]['q'], 'volume': vol_out}
+            for k, i in enumerate(out_idx.tolist())
+        )
+
+        for p, inside in zip(parcels, (px0 < 1).tolist()):
+            if inside:
                 p['x1'] = 1
-                new_state.append(p)
-            else:
-                new_state.append(p)
 
-        self.mixed_parcels = output
-        self.state         = new_state
         self.parcels_out(flows_out)
@@ -65,6 +65,10 @@ class Models:
         """
         self._tank_model_map: Dict[str, TankModelClass] = tank_model_map or {}
 
+        # One intern pool for the quality dicts of this network; shared by
+        # all node models so equal mixtures resolve to the same object.
+        self._q_pool: Dict[frozenset, Dict[int, float]] = {}
+
         self.nodes:      Dict[str, Any]       = {}
         self.junctions:  Dict[str, Junction]  = {}
         self.reservoirs: Dict[str, Reservoir] = {}
@@ -89,11 +93,15 @@ class Models:
         self._create_models(network.junctions, Junction,  self.junctions,  self.nodes)
         self._create_models(network.reservoirs, Reservoir, self.reservoirs, self.nodes)
 
-        for tank in network.tanks:
-            model_cls  = self._tank_model_map.get(tank.uid, Tank_CSTR)
-            tank_model = model_cls(tank.initvolume)
-            self.tanks[tank.uid] = tank_model
-            self.nodes[tank.uid] = tank_model
+        tank_map = self._tank_model_map
+        self.tanks.update({
+            tank.uid: tank_map.get(tank.uid, Tank_CSTR)(tank.initvolume)
+            for tank in network.tanks
+        })
+        self.nodes.update(self.tanks)
+
+        for model in self.nodes.values():
+            model._q_pool = self._q_pool
 
         logger.debug(
             "Loaded %d junctions, %d reservoirs, %d tanks",
@@ -104,11 +112,12 @@ class Models:
 
     def _load_links(self, network: Any) -> None:
         """Create link models from network pipes, pumps, and valves."""
-        for pipe in network.pipes:
-            pipe_volume = self._calculate_pipe_volume(pipe.length, pipe.diameter)
-            pipe_model  = Pipe(volume=pipe_volume)
-            self.pipes[pipe.uid] = pipe_model
-            self.links[pipe.uid] = pipe_model
+        pipe_volume = self._calculate_pipe_volume
+        self.pipes.update({
+            pipe.uid: Pipe(volume=pipe_volume(pipe.length, pipe.diameter))
+            for pipe in network.pipes
+        })
+        self.links.update(self.pipes)
 
         self._create_models(network.pumps,  Pump,  self.pumps,  self.links)
         self._create_models(network.valves, Valve, self.valves, self.links)
@@ -132,10 +141,9 @@ class Models:
             model_dict:  Dict for the created models (indexed by uid).
             update_dict: Dict that is also updated (nodes or links).
         """
-        for item in items:
-            model = model_cls()
-            model_dict[item.uid] = model
-            update_dict[item.uid] = model
+        created = {item.uid: model_cls() for item in items}
+        model_dict.update(created)
+        update_dict.update(created)
 
     # ── Hulpmethoden ─────────────────────────────────────────────────────────
 
@@ -217,6 +225,7 @@ class Models:
                          getattr(existing, 'maxvolume', 0.0))
 
         new_model = model_cls(initvolume)
+        new_model._q_pool = self._q_pool
         self.tanks[tank_uid] = new_model
         self.nodes[tank_uid] = new_model
         logger.info("Tank '%s' model replaced with %s", tank_uid, model_cls.__name__)
@@ -12,12 +12,25 @@ Changes compared to v2:
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import List, Dict, Any, Optional, FrozenSet, Tuple
+from typing import List, Dict, Any, Iterable, NamedTuple, Optional, FrozenSet, Set, Tuple
 import logging
+import numpy as np
+
+from .fifo import _parcel_bounds
 
 logger = logging.getLogger(__name__)
 
 
+class NodeProperties(NamedTuple):
+    """Water properties at a node outlet; unpacks as (pH, sc, temperature)."""
+    pH:          float
+    sc:          float
+    temperature: float
+
+
+_NO_PROPERTIES = NodeProperties(0.0, 0.0, 0.0)
+
+
 class Quality:
     """
     Quality calculator for water chemistry in the network.
@@ -29,9 +42,13 @@ class Quality:
         Maximum size of the LRU cache for PHREEQC mixtures.
         Increase for networks with many unique mixture combinations.
         Default 256.
+    total_cache_size : int
+        Maximum number of cached mixture.total() results. The cache is
+        emptied once it reaches this size. Default 4096.
     """
 
-    mix_cache_size: int = 512
+    mix_cache_size:   int = 512
+    total_cache_size: int = 4096
 
     def __init__(self, pp: Any, models: Any):
         """
@@ -43,13 +60,39 @@ class Quality:
         """
         self.pp     = pp
         self.models = models
+
+        # Shadow of pp.get_solution_list(); refreshed lazily on a miss and
+        # dropped together with the mix cache.
+        self._available: Optional[Set[int]] = None
+        # mixture.total() results per (mix key, element, units); cleared
+        # together with the mix cache.
+        self._total_cache: Dict[Tuple[FrozenSet, str, str], float] = {}
+        # PHREEQC solution objects by number, looked up once per solution
+        # instead of once per mix.
+        self._solution_objs: Dict[int, Any] = {}
+        # Number of solutions created through pp.mix_solutions; never reset,
+        # so callers can tell whether PHREEQC gained solutions since a check.
+        self._mix_count: int = 0
         self._build_mix_cache()
 
     # ── Cache management ──────────────────────────────────────────────────────
 
+    def _available_solutions(self, refresh: bool = False) -> Set[int]:
+        """
+        Return the set of solution numbers known to PHREEQC.
+
+        The set is cached between calls. Solutions added to pp after the
+        last refresh are picked up by calling with refresh=True.
+        """
+        if refresh or self._available is None:
+            self._available = set(self.pp.get_solution_list())
+        return self._available
+
     def _build_mix_cache(self) -> None:
         """Build (or rebuild) the LRU cache for _mix_phreeqc_solutions."""
         pp = self.pp
+        available_solutions = self._available_solutions
+        solution_objs       = self._solution_objs
 
         @lru_cache(maxsize=self.mix_cache_size)
         def _cached_mix(key: FrozenSet[Tuple[int, float]]) -> Optional[Any]:
@@ -64,18 +107,25 @@ class Quality:
             if not solution_dict:
                 return None
             try:
-                available = set(pp.get_solution_list())
+                available = available_solutions()
+                if not available.issuperset(solution_dict):
+                    available = available_solutions(refresh=True)
+                    missing   = [n for n in solution_dict if n not in available]
+                    if missing and logger.isEnabledFor(logging.WARNING):
+                        logger.warning(
+                            "Solution(s) %s not found in PHREEQC, skipping", missing
+                        )
                 mix_temp  = {}
                 for sol_num, frac in solution_dict.items():
                     if sol_num not in available:
-                        logger.warning(
-                            "Solution %s not found in PHREEQC, skipping", sol_num
-                        )
                         continue
-                    phreeqc_sol = pp.get_solution(sol_num)
+                    phreeqc_sol = solution_objs.get(sol_num)
+                    if phreeqc_sol is None:
+                        phreeqc_sol = solution_objs[sol_num] = pp.get_solution(sol_num)
                     if phreeqc_sol:
                         mix_temp[phreeqc_sol] = frac
                 if mix_temp:
+                    self._mix_count += 1
                     return pp.mix_solutions(mix_temp)
                 logger.warning("No valid solutions found to mix from %s", solution_dict)
                 return None
@@ -89,15 +139,22 @@ class Quality:
 
         self._cached_mix = _cached_mix
 
-    def invalidate_mix_cache(self) -> None:
+    def invalidate_mix_cache(self, available: Optional[Set[int]] = None) -> None:
         """
         Discard the PHREEQC mixture cache.
 
         Call when solutions have been added or removed from the pp
         instance outside Victoria's control, so that stale cache entries
         are no longer returned.
+
+        Args:
+            available: The solution numbers now known to PHREEQC, if the
+                       caller already has them; saves re-reading the list.
         """
         self._cached_mix.cache_clear()
+        self._available = set(available) if available is not None else None
+        self._total_cache.clear()
+        self._solution_objs.clear()
         logger.debug("PHREEQC mix cache cleared")
 
     @property
@@ -122,15 +179,42 @@ class Quality:
         """
         if not solution_dict:
             return None
-        # Round fractions to avoid floating-point noise in the cache key
-        key = frozenset(
+        key = self._mix_key(solution_dict)
+        if not key:
+            return None
+        return self._cached_mix(key)
+
+    def _single_solution(self, solution_dict: Dict[int, float]) -> Optional[Any]:
+        """
+        Return the PHREEQC solution itself when solution_dict is one
+        solution at fraction 1.0, otherwise None.
+
+        Water that is entirely one source solution needs no mixing; the
+        solution object is returned as is and the mix cache is bypassed.
+        """
+        if len(solution_dict) != 1:
+            return None
+        (sol_num, frac), = solution_dict.items()
+        if frac < 1.0 - 1e-9:
+            return None
+        phreeqc_sol = self._solution_objs.get(sol_num)
+        if phreeqc_sol is None:
+            available = self._available_solutions()
+            if sol_num not in available:
+                available = self._available_solutions(refresh=True)
+                if sol_num not in available:
+                    return None
+            phreeqc_sol = self._solution_objs[sol_num] = self.pp.get_solution(sol_num)
+        return phreeqc_sol
+
+    @staticmethod
+    def _mix_key(solution_dict: Dict[int, float]) -> FrozenSet[Tuple[int, float]]:
+        """Return the cache key for a solution dict (fractions rounded to 8 dp)."""
+        return frozenset(
             (sol_num, round(frac, 8))
             for sol_num, frac in solution_dict.items()
             if frac > 0
         )
-        if not key:
-            return None
-        return self._cached_mix(key)
 
     def _calculate_concentration(self, solution_dict: Dict[int, float],
                                   element: str, units: str) -> float:
@@ -145,14 +229,59 @@ class Quality:
         Returns:
             Calculated concentration.
         """
-        mixture = self._mix_phreeqc_solutions(solution_dict)
+        key = self._mix_key(solution_dict)
+        if not key:
+            return 0.0
+        total_key = (key, element, units)
+        conc = self._total_cache.get(total_key)
+        if conc is not None:
+            return conc
+
+        mixture = self._single_solution(solution_dict)
+        if mixture is None:
+            mixture = self._cached_mix(key)
         if mixture:
             try:
-                return mixture.total(element, units)
+                conc = mixture.total(element, units)
             except Exception as e:
-                logger.warning("Error calculating %s: %s", element, e)
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning("Error calculating %s: %s", element, e)
+                return 0.0
+            if len(self._total_cache) >= self.total_cache_size:
+                self._total_cache.clear()
+            self._total_cache[total_key] = conc
+            return conc
         return 0.0
 
+    def _parcel_concentrations(self, parcels: List[Dict[str, Any]],
+                               element: str, units: str) -> np.ndarray:
+        """
+        Return the concentration of every parcel as an array.
+
+        Parcels with identical quality dicts are evaluated only once; the
+        same upstream mixture typically occupies several parcels.
+        """
+        seen: Dict[FrozenSet, float] = {}
+        by_id: Dict[int, float] = {}      # interned dicts resolve here
+        concs = np.empty(len(parcels), dtype=np.float64)
+        for i, parcel in enumerate(parcels):
+            q    = parcel['q']
+            conc = by_id.get(id(q))
+            if conc is None:
+                key  = frozenset(q.items())
+                conc = seen.get(key)
+                if conc is None:
+                    conc = seen[key] = self._calculate_concentration(q, element, units)
+                by_id[id(q)] = conc
+            concs[i] = conc
+        return concs
+
+    @staticmethod
+    def _parcel_fractions(parcels: List[Dict[str, Any]]) -> np.ndarray:
+        """Return x1 - x0 of every parcel as an array."""
+        x0, x1 = _parcel_bounds(parcels)
+        return x1 - x0
+
     # ── Parcel access ─────────────────────────────────────────────────────────
 
     def get_parcels(self, link: Any) -> List[Dict[str, Any]]:
@@ -163,10 +292,13 @@ class Quality:
             link: Pipe link object.
 
         Returns:
-            List of parcel dicts.
+            List of parcel dicts. These are copies; the quality dicts in
+            the model are shared between parcels and must stay unchanged.
         """
         link_model = self.models.pipes.get(link.uid)
-        return link_model.state if link_model else []
+        if not link_model:
+            return []
+        return [dict(p, q=dict(p['q'])) for p in link_model.state]
 
     # ── Node concentrations ───────────────────────────────────────────────────
 
@@ -213,12 +345,8 @@ class Quality:
         if not avg:
             return self._calculate_concentration(mixed_parcels[0]['q'], element, units)
 
-        mixture = 0.0
-        for parcel in mixed_parcels:
-            conc     = self._calculate_concentration(parcel['q'], element, units)
-            fraction = parcel['x1'] - parcel['x0']
-            mixture += conc * fraction
-        return mixture
+        concs = self._parcel_concentrations(mixed_parcels, element, units)
+        return float(concs @ self._parcel_fractions(mixed_parcels))
 
     # ── Mixture fractions ─────────────────────────────────────────────────────
 
@@ -230,13 +358,13 @@ class Quality:
             node: Node object.
 
         Returns:
-            Dict mapping solution numbers to fractions.
+            Dict mapping solution numbers to fractions (a copy).
         """
         node_model    = self.models.nodes.get(node.uid)
         mixed_parcels = getattr(node_model, 'mixed_parcels', None)
         if not node_model or not mixed_parcels:
             return {}
-        return mixed_parcels[0]['q']
+        return dict(mixed_parcels[0]['q'])
 
     def get_mixture_node_avg(self, node: Any) -> Dict[int, float]:
         """
@@ -253,12 +381,24 @@ class Quality:
         if not node_model or not mixed_parcels:
             return {}
 
-        average_dict: Dict[int, float] = {}
+        # Flatten all (solution, fraction) pairs into one column index and
+        # one weight array, then accumulate per solution with bincount.
+        sol_idx: Dict[int, int] = {}
+        cols:    List[int]      = []
+        vals:    List[float]    = []
+        counts:  List[int]      = []
         for parcel in mixed_parcels:
-            frac = parcel['x1'] - parcel['x0']
-            for sol_num, sol_frac in parcel['q'].items():
-                average_dict[sol_num] = average_dict.get(sol_num, 0.0) + sol_frac * frac
-        return average_dict
+            q = parcel['q']
+            counts.append(len(q))
+            vals.extend(q.values())
+            cols.extend(sol_idx.setdefault(sol_num, len(sol_idx)) for sol_num in q)
+        if not cols:
+            return {}
+
+        weights = (np.array(vals, dtype=np.float64) *
+                   np.repeat(self._parcel_fractions(mixed_parcels), counts))
+        acc     = np.bincount(cols, weights=weights, minlength=len(sol_idx))
+        return dict(zip(sol_idx, acc.tolist()))
 
     # ── Pipe concentrations ───────────────────────────────────────────────────
 
@@ -280,13 +420,10 @@ class Quality:
         if not link_model or not state:
             return []
 
+        concs = self._parcel_concentrations(state, element, units).tolist()
         return [
-            {
-                'x0': parcel['x0'],
-                'x1': parcel['x1'],
-                'q':  self._calculate_concentration(parcel['q'], element, units),
-            }
-            for parcel in state
+            {'x0': parcel['x0'], 'x1': parcel['x1'], 'q': conc}
+            for parcel, conc in zip(state, concs)
         ]
 
     def get_conc_pipe_avg(self, link: Any, element: str,
@@ -307,56 +444,114 @@ class Quality:
         if not link_model or not state:
             return 0.0
 
-        average_conc = 0.0
-        for parcel in state:
-            conc     = self._calculate_concentration(parcel['q'], element, units)
-            vol_frac = parcel['x1'] - parcel['x0']
-            average_conc += conc * vol_frac
-        return average_conc
+        concs = self._parcel_concentrations(state, element, units)
+        return float(concs @ self._parcel_fractions(state))
 
     # ── Node properties ───────────────────────────────────────────────────────
 
-    def get_properties_node(self, node: Any) -> List[float]:
+    def get_properties_node(self, node: Any) -> NodeProperties:
         """
         Return instantaneous water properties at the node outlet.
 
         Returns:
-            List of [pH, specific conductivity, temperature].
+            NodeProperties(pH, specific conductivity, temperature).
         """
         return self._get_properties_node_internal(node, avg=False)
 
-    def get_properties_node_avg(self, node: Any) -> List[float]:
+    def get_properties_node_avg(self, node: Any) -> NodeProperties:
         """
         Return time-averaged water properties at the node outlet.
 
         Returns:
-            List of [pH, specific conductivity, temperature].
+            NodeProperties(pH, specific conductivity, temperature).
         """
         return self._get_properties_node_internal(node, avg=True)
 
-    def _get_properties_node_internal(self, node: Any, avg: bool) -> List[float]:
+    def _get_properties_node_internal(self, node: Any, avg: bool) -> NodeProperties:
         """Shared logic for node properties (instantaneous or time-averaged)."""
         node_model    = self.models.nodes.get(node.uid)
         mixed_parcels = getattr(node_model, 'mixed_parcels', None)
         if not node_model or not mixed_parcels:
-            return [0.0, 0.0, 0.0]
+            return _NO_PROPERTIES
 
         if not avg:
-            mixture = self._mix_phreeqc_solutions(mixed_parcels[0]['q'])
+            q       = mixed_parcels[0]['q']
+            mixture = self._single_solution(q)
+            if mixture is None:
+                mixture = self._mix_phreeqc_solutions(q)
             if mixture:
-                return [
+                return NodeProperties(
                     getattr(mixture, 'pH',          0.0),
-                    getattr(mixture, 'sc',           0.0),
-                    getattr(mixture, 'temperature',  0.0),
-                ]
-            return [0.0, 0.0, 0.0]
+                    getattr(mixture, 'sc',          0.0),
+                    getattr(mixture, 'temperature', 0.0),
+                )
+            return _NO_PROPERTIES
+
+        # One (pH, sc, temperature) row per parcel; identical mixtures are
+        # looked up only once, then the rows are weighted in one product.
+        seen: Dict[FrozenSet, Tuple[float, float, float]] = {}
+        props = np.zeros((len(mixed_parcels), 3), dtype=np.float64)
+        for i, parcel in enumerate(mixed_parcels):
+            key = frozenset(parcel['q'].items())
+            row = seen.get(key)
+            if row is None:
+                mixture = self._mix_phreeqc_solutions(parcel['q'])
+                row = seen[key] = (
+                    (getattr(mixture, 'pH',          0.0),
+                     getattr(mixture, 'sc',          0.0),
+                     getattr(mixture, 'temperature', 0.0))
+                    if mixture else (0.0, 0.0, 0.0)
+                )
+            props[i] = row
+        return NodeProperties(*(self._parcel_fractions(mixed_parcels) @ props).tolist())
+
+    # ── Batched queries ───────────────────────────────────────────────────────
+
+    def get_conc_nodes(self, nodes: Iterable[Any], element: str,
+                       units: str = 'mmol', avg: bool = False) -> np.ndarray:
+        """
+        Concentration at the outlet of every node in *nodes*.
 
-        temp = [0.0, 0.0, 0.0]
-        for parcel in mixed_parcels:
-            mixture = self._mix_phreeqc_solutions(parcel['q'])
-            if mixture:
-                frac     = parcel['x1'] - parcel['x0']
-                temp[0] += frac * getattr(mixture, 'pH',         0.0)
-                temp[1] += frac * getattr(mixture, 'sc',          0.0)
-                temp[2] += frac * getattr(mixture, 'temperature', 0.0)
-        return temp
+        Equivalent to calling get_conc_node() (or get_conc_node_avg() with
+        avg=True) per node, but fills one preallocated array.
+
+        Returns:
+            Array of shape (len(nodes),).
+        """
+        nodes = list(nodes)
+        out   = np.empty(len(nodes), dtype=np.float64)
+        conc  = self._get_conc_node_internal
+        for i, node in enumerate(nodes):
+            out[i] = conc(node, element, units, avg)
+        return out
+
+    def get_conc_pipes_avg(self, links: Iterable[Any], element: str,
+                           units: str = 'mmol') -> np.ndarray:
+        """
+        Volume-averaged concentration of every pipe in *links*.
+
+        Returns:
+            Array of shape (len(links),).
+        """
+        links = list(links)
+        out   = np.empty(len(links), dtype=np.float64)
+        conc  = self.get_conc_pipe_avg
+        for i, link in enumerate(links):
+            out[i] = conc(link, element, units)
+        return out
+
+    def get_properties_nodes(self, nodes: Iterable[Any],
+                             avg: bool = False) -> np.ndarray:
+        """
+        Water properties at the outlet of every node in *nodes*.
+
+        Returns:
+            Array of shape (len(nodes), 3) with columns pH, specific
+            conductivity and temperature.
+        """
+        nodes = list(nodes)
+        out   = np.empty((len(nodes), 3), dtype=np.float64)
+        props = self._get_properties_node_internal
+        for i, node in enumerate(nodes):
+            out[i] = props(node, avg)
+        return out
@@ -18,11 +18,14 @@ Changes compared to v2:
 from __future__ import annotations
 
 import math
+from itertools import chain
 from typing import Any, Dict, List, Optional
 import numpy as np
 import pandas as pd
 import math as _math_seg
 
+from .fifo import _parcel_bounds
+
 _NICE_LENGTHS = [1, 2, 5, 10, 25, 50, 100, 250, 500]
 
 
@@ -99,6 +102,83 @@ def print_seg_advice(r: Dict) -> None:
               "without loss of information.")
 
 
+def _segment_averages(px0: np.ndarray, px1: np.ndarray, values: np.ndarray,
+                      x0_seg: np.ndarray, x1_seg: np.ndarray):
+    """
+    Overlap-weighted average of parcel values over every segment.
+
+    ``values`` has one row per parcel and one column per quantity, so all
+    quantities share a single overlap computation. Returns the (n_segs, k)
+    averages (0.0 for segments without parcels) and the number of parcels
+    overlapping each segment.
+
+    Segments must be sorted and non-overlapping. Pipe states (sorted,
+    contiguous parcels) take a sweep that is linear in segments + parcels;
+    any other parcel layout falls back to the full overlap matrix.
+    """
+    keep = px1 > px0                       # zero-width parcels never overlap
+    if not keep.all():
+        px0, px1, values = px0[keep], px1[keep], values[keep]
+    if len(px0) > 1:
+        order = np.argsort(px0, kind='stable')
+        if (np.diff(order) < 0).any():
+            px0, px1, values = px0[order], px1[order], values[order]
+        if (px0[1:] < px1[:-1]).any():
+            return _segment_averages_dense(px0, px1, values, x0_seg, x1_seg)
+
+    n = len(px0)
+    k = values.shape[1]
+    if n == 0:
+        return np.zeros((len(x0_seg), k)), np.zeros(len(x0_seg), dtype=np.intp)
+
+    # Segment i overlaps parcels lo[i] .. hi[i]-1. The two edge parcels are
+    # clipped exactly; the ones in between are fully covered and come from
+    # prefix sums, so a sliver overlap never suffers from cancellation.
+    lo   = np.searchsorted(px1, x0_seg, side='right')
+    hi   = np.searchsorted(px0, x1_seg, side='left')
+    n_ov = np.maximum(hi - lo, 0)
+
+    li   = np.minimum(lo, n - 1)
+    ri   = np.clip(hi - 1, 0, n - 1)
+    ov_l = np.where(n_ov >= 1, np.minimum(x1_seg, px1[li]) - np.maximum(x0_seg, px0[li]), 0.0)
+    ov_r = np.where(n_ov >= 2, np.minimum(x1_seg, px1[ri]) - np.maximum(x0_seg, px0[ri]), 0.0)
+
+    width = px1 - px0
+    w_cum = np.concatenate(([0.0], np.cumsum(width)))
+    v_cum = np.vstack((np.zeros((1, k)), np.cumsum(width[:, None] * values, axis=0)))
+    i_lo  = np.minimum(lo + 1, n)
+    i_hi  = np.maximum(hi - 1, i_lo)
+
+    ot       = ov_l + ov_r + (w_cum[i_hi] - w_cum[i_lo])
+    weighted = (ov_l[:, None] * values[li] + ov_r[:, None] * values[ri] +
+                (v_cum[i_hi] - v_cum[i_lo]))
+
+    covered = n_ov > 0
+    safe_ot = np.where(covered, ot, 1.0)             # avoid division by zero
+    avg     = np.where(covered[:, None], weighted / safe_ot[:, None], 0.0)
+    return avg, n_ov
+
+
+def _segment_averages_dense(px0: np.ndarray, px1: np.ndarray, values: np.ndarray,
+                            x0_seg: np.ndarray, x1_seg: np.ndarray):
+    """_segment_averages via the full (n_segs × n_parcels) overlap matrix."""
+    # ov[i, j] = overlap of segment i with parcel j (0 if no overlap)
+    ov = np.maximum(
+        0.0,
+        np.minimum(x1_seg[:, None], px1[None, :]) -
+        np.maximum(x0_seg[:, None], px0[None, :])
+    )  # (n_segs, n_parcels)
+
+    ot       = ov.sum(axis=1)                        # total overlap per segment
+    weighted = ov @ values                           # (n_segs, k)
+    n_ov     = (ov > 0).sum(axis=1)
+
+    covered = ot > 0
+    safe_ot = np.where(covered, ot, 1.0)             # avoid division by zero
+    avg     = np.where(covered[:, None], weighted / safe_ot[:, None], 0.0)
+    return avg, n_ov
+
+
 __all__ = ["PipeSegmentation"]
 
 
@@ -118,7 +198,15 @@ class PipeSegmentation:
             raise ValueError(f"seg_length_m must be > 0, got {seg_length_m}")
         self.model        = model
         self.seg_length_m = seg_length_m
-        self._time_records: List[Dict] = []
+        # One column block (column name -> list of values) per record_step
+        # call; assembled into a single DataFrame by to_dataframe().
+        self._time_records: List[Dict[str, list]] = []
+        self._n_records:    int                   = 0
+        # (pipe_length, seg_length_m) -> segment layout, see _seg_bounds()
+        self._layouts: Dict[tuple, tuple] = {}
+        # pipe uid -> (cache key, segment rows) of the last evaluation,
+        # reused by record_step/segment_network while the pipe is unchanged
+        self._last_seen: Dict[Any, tuple] = {}
 
         self._sol_high_num: Optional[int] = None
         self._ca_high_mg:   float         = 0.0
@@ -207,6 +295,60 @@ class PipeSegmentation:
             return self._seg_fast(pipe, pipe_length)
         return self._seg_phreeqc(pipe, pipe_length, species, units)
 
+    def _segment_pipe_cached(self, pipe: Any, species: str,
+                             units: str) -> List[Dict]:
+        """
+        segment_pipe() with reuse of the previous rows for pipes whose
+        parcel state has not changed (same FIFO.state_version).
+
+        The returned rows are shared with the cache and must not be
+        modified; link models without an integer state_version are always
+        evaluated.
+        """
+        link_model = self.model.models.pipes.get(pipe.uid)
+        version    = getattr(link_model, "state_version", None)
+        if type(version) is not int:
+            return self.segment_pipe(pipe, species, units)
+
+        key = (version, id(link_model.state), getattr(pipe, "length", 0.0),
+               self.seg_length_m, species, units, self._calibrated,
+               self._sol_high_num, self._ca_high_mg, self._sc_high)
+        hit = self._last_seen.get(pipe.uid)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        rows = self.segment_pipe(pipe, species, units)
+        self._last_seen[pipe.uid] = (key, rows)
+        return rows
+
+    def _seg_bounds(self, pipe_length: float):
+        """
+        Segment layout of a pipe: start and end positions normalised to
+        the pipe length (0..1) plus the rounded position fields of every
+        segment row.
+
+        The layout depends only on the pipe and segment length, so it is
+        cached and reused for every recorded time step.
+        """
+        key    = (pipe_length, self.seg_length_m)
+        layout = self._layouts.get(key)
+        if layout is None:
+            n_segs = math.ceil(pipe_length / self.seg_length_m)
+            s0_arr = np.arange(n_segs, dtype=np.float64) * self.seg_length_m
+            s1_arr = np.minimum(s0_arr + self.seg_length_m, pipe_length)
+            fields = [
+                {
+                    "seg_id":    i + 1,
+                    "x_start_m": round(s0, 6),
+                    "x_end_m":   round(s1, 6),
+                    "x_mid_m":   round((s0 + s1) / 2, 6),
+                    "length_m":  round(s1 - s0, 6),
+                }
+                for i, (s0, s1) in enumerate(zip(s0_arr.tolist(), s1_arr.tolist()))
+            ]
+            layout = self._layouts[key] = (s0_arr / pipe_length,
+                                           s1_arr / pipe_length, fields)
+        return layout
+
     def _seg_fast(self, pipe: Any, pipe_length: float) -> List[Dict]:
         link_model = self.model.models.pipes.get(pipe.uid)
         if link_model is None:
@@ -215,54 +357,23 @@ class PipeSegmentation:
         if not state:
             return []
 
-        n_segs = math.ceil(pipe_length / self.seg_length_m)
-
         # ── Build parcel arrays once ──────────────────────────────────────────
-        px0   = np.array([p["x0"] for p in state], dtype=np.float64)
-        px1   = np.array([p["x1"] for p in state], dtype=np.float64)
-        p_hi  = np.array([p["q"].get(self._sol_high_num, 0.0) for p in state],
-                          dtype=np.float64)
-        p_conc = p_hi * self._ca_high_mg   # concentration contribution per parcel
-        p_sc   = p_hi * self._sc_high       # sc contribution per parcel
-
-        # ── Segment boundaries as arrays ──────────────────────────────────────
-        seg_idx_arr = np.arange(n_segs, dtype=np.float64)
-        s0_arr = seg_idx_arr * self.seg_length_m
-        s1_arr = np.minimum(s0_arr + self.seg_length_m, pipe_length)
-        x0_seg = s0_arr / pipe_length
-        x1_seg = s1_arr / pipe_length
-
-        # ── Vectorised overlap matrix: shape (n_segs, n_parcels) ─────────────
-        # ov[i, j] = overlap of segment i with parcel j (0 if no overlap)
-        ov = np.maximum(
-            0.0,
-            np.minimum(x1_seg[:, None], px1[None, :]) -
-            np.maximum(x0_seg[:, None], px0[None, :])
-        )  # (n_segs, n_parcels)
-
-        ot       = ov.sum(axis=1)                    # total overlap per segment
-        wc       = (ov * p_conc[None, :]).sum(axis=1)
-        ws       = (ov * p_sc[None, :]).sum(axis=1)
-        n_ov_arr = (ov > 0).sum(axis=1)
-
-        safe_ot = np.where(ot > 0, ot, 1.0)         # avoid division by zero
-
-        results = []
-        for i in range(n_segs):
-            s0 = float(s0_arr[i])
-            s1 = float(s1_arr[i])
-            t  = float(ot[i])
-            results.append({
-                "seg_id":    i + 1,
-                "x_start_m": round(s0, 6),
-                "x_end_m":   round(s1, 6),
-                "x_mid_m":   round((s0 + s1) / 2, 6),
-                "length_m":  round(s1 - s0, 6),
-                "conc":      float(wc[i] / safe_ot[i]) if t > 0 else 0.0,
-                "sc":        float(ws[i] / safe_ot[i]) if t > 0 else 0.0,
-                "n_parcels": int(n_ov_arr[i]),
-            })
-        return results
+        n_par = len(state)
+        hi    = self._sol_high_num
+        px0, px1 = _parcel_bounds(state)
+        p_hi  = np.fromiter((p["q"].get(hi, 0.0) for p in state),
+                            dtype=np.float64, count=n_par)
+        # Columns: concentration and sc contribution per parcel
+        p_vals = np.outer(p_hi, (self._ca_high_mg, self._sc_high))
+
+        x0_seg, x1_seg, fields = self._seg_bounds(pipe_length)
+        avg, n_ov = _segment_averages(px0, px1, p_vals, x0_seg, x1_seg)
+        conc, sc = avg.T.tolist()
+
+        return [
+            {**f, "conc": c, "sc": v, "n_parcels": k}
+            for f, c, v, k in zip(fields, conc, sc, n_ov.tolist())
+        ]
 
     def _seg_phreeqc(self, pipe: Any, pipe_length: float,
                      species: str, units: str) -> List[Dict]:
@@ -270,87 +381,78 @@ class PipeSegmentation:
         if not parcels:
             return []
 
-        n_segs = math.ceil(pipe_length / self.seg_length_m)
-
         # ── Build parcel arrays once ──────────────────────────────────────────
-        px0   = np.array([p["x0"] for p in parcels], dtype=np.float64)
-        px1   = np.array([p["x1"] for p in parcels], dtype=np.float64)
-        pconc = np.array([p["q"]  for p in parcels], dtype=np.float64)
-
-        # ── Segment boundaries as arrays ──────────────────────────────────────
-        seg_idx_arr = np.arange(n_segs, dtype=np.float64)
-        s0_arr = seg_idx_arr * self.seg_length_m
-        s1_arr = np.minimum(s0_arr + self.seg_length_m, pipe_length)
-        x0_seg = s0_arr / pipe_length
-        x1_seg = s1_arr / pipe_length
-
-        # ── Vectorised overlap matrix: shape (n_segs, n_parcels) ─────────────
-        ov = np.maximum(
-            0.0,
-            np.minimum(x1_seg[:, None], px1[None, :]) -
-            np.maximum(x0_seg[:, None], px0[None, :])
-        )
+        n_par = len(parcels)
+        px0, px1 = _parcel_bounds(parcels)
+        pconc = np.fromiter((p["q"]  for p in parcels), dtype=np.float64, count=n_par)
 
-        ot       = ov.sum(axis=1)
-        ws       = (ov * pconc[None, :]).sum(axis=1)
-        n_ov_arr = (ov > 0).sum(axis=1)
-        safe_ot  = np.where(ot > 0, ot, 1.0)
-
-        results = []
-        for i in range(n_segs):
-            s0 = float(s0_arr[i])
-            s1 = float(s1_arr[i])
-            t  = float(ot[i])
-            results.append({
-                "seg_id":    i + 1,
-                "x_start_m": round(s0, 6),
-                "x_end_m":   round(s1, 6),
-                "x_mid_m":   round((s0 + s1) / 2, 6),
-                "length_m":  round(s1 - s0, 6),
-                "conc":      float(ws[i] / safe_ot[i]) if t > 0 else 0.0,
-                "n_parcels": int(n_ov_arr[i]),
-            })
-        return results
+        x0_seg, x1_seg, fields = self._seg_bounds(pipe_length)
+        avg, n_ov = _segment_averages(px0, px1, pconc[:, None], x0_seg, x1_seg)
+
+        return [
+            {**f, "conc": c, "n_parcels": k}
+            for f, c, k in zip(fields, avg[:, 0].tolist(), n_ov.tolist())
+        ]
 
     # ── Network level ────────────────────────────────────────────────────────
 
+    def _collect_segments(self, network: Any, species: str, units: str):
+        """Segment rows of every pipe plus the matching pipe uid per row."""
+        pipes: List[Any]  = []
+        segs:  List[Dict] = []
+        for pipe in network.pipes:
+            rows = self._segment_pipe_cached(pipe, species, units)
+            pipes.extend([pipe.uid] * len(rows))
+            segs.extend(rows)
+        return pipes, segs
+
     def segment_network(self, network: Any, species: str = "Ca",
                         units: str = "mg") -> pd.DataFrame:
-        rows: List[Dict] = []
-        for pipe in network.pipes:
-            for s in self.segment_pipe(pipe, species, units):
-                rows.append({"pipe": pipe.uid, **s})
-        df = pd.DataFrame(rows)
-        if df.empty:
-            return df
-        base = ["pipe", "seg_id", "x_start_m", "x_end_m", "x_mid_m",
-                "length_m", "conc"]
-        if "sc" in df.columns:
+        pipes, segs = self._collect_segments(network, species, units)
+        if not segs:
+            return pd.DataFrame()
+        base = ["seg_id", "x_start_m", "x_end_m", "x_mid_m", "length_m", "conc"]
+        if "sc" in segs[0]:
             base.append("sc")
         base.append("n_parcels")
-        return df[[c for c in base if c in df.columns]].reset_index(drop=True)
+        columns = {"pipe": pipes}
+        columns.update({c: [s[c] for s in segs] for c in base})
+        return pd.DataFrame(columns)
 
     def record_step(self, network: Any, species: str = "Ca", units: str = "mg",
                     time_s: Optional[float] = None,
                     step: Optional[int] = None) -> None:
-        for pipe in network.pipes:
-            for s in self.segment_pipe(pipe, species, units):
-                record: Dict = {"pipe": pipe.uid}
-                if step   is not None:
-                    record["step"] = step
-                if time_s is not None:
-                    record["time_s"]   = time_s
-                    record["time_min"] = round(time_s / 60, 4)
-                record.update(s)
-                self._time_records.append(record)
+        pipes, segs = self._collect_segments(network, species, units)
+        if not segs:
+            return
+
+        n = len(segs)
+        block: Dict[str, list] = {"pipe": pipes}
+        if step is not None:
+            block["step"] = [step] * n
+        if time_s is not None:
+            block["time_s"]   = [time_s] * n
+            block["time_min"] = [round(time_s / 60, 4)] * n
+        for key in segs[0]:
+            block[key] = [s[key] for s in segs]
+        self._time_records.append(block)
+        self._n_records += n
 
     def to_dataframe(self) -> pd.DataFrame:
-        if not self._time_records:
+        blocks = self._time_records
+        if not blocks:
             return pd.DataFrame()
-        return pd.DataFrame(self._time_records).reset_index(drop=True)
+        columns = list(blocks[0])
+        if all(list(b) == columns for b in blocks):
+            return pd.DataFrame({
+                c: list(chain.from_iterable(b[c] for b in blocks)) for c in columns
+            })
+        # Blocks recorded with different metadata: let pandas align them
+        return pd.concat([pd.DataFrame(b) for b in blocks], ignore_index=True)
 
     def reset(self) -> None:
         self._time_records = []
+        self._n_records    = 0
 
     def pipe_metadata(self, network: Any) -> pd.DataFrame:
         rows = []
@@ -373,5 +475,5 @@ class PipeSegmentation:
         return (
             f"PipeSegmentation(seg_length_m={self.seg_length_m}, "
             f"calibrated={self._calibrated}, "
-            f"recorded={len(self._time_records)})"
+            f"recorded={self._n_records})"
         )
@@ -24,11 +24,15 @@ EPANET property codes (from epynet/epanet2.py):
 
 from __future__ import annotations
 
-from collections import deque
-from typing import Any, Dict, List, Optional, Set
+from functools import lru_cache
+from itertools import chain, islice, repeat
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional, Set
 import logging
 import numpy as np
 
+from .mix import _get_attr_value
+
 logger = logging.getLogger(__name__)
 
 # EPANET property codes — mirrored from epynet/epanet2.py
@@ -41,6 +45,43 @@ _EN_NODE_DEMAND   = 9   # ENgetnodevalue
 _EN_TANKVOLUME    = 24  # ENgetnodevalue
 
 
+# ── Inflow ────────────────────────────────────────────────────────────────────
+
+_output_state = attrgetter('output_state')
+
+
+def _gather_inflow(link_models: Dict[str, Any], up_uids: List[str]) -> List[Dict[str, Any]]:
+    """Concatenate the output parcels of the given upstream links."""
+    return list(chain.from_iterable(map(_output_state,
+                                        map(link_models.__getitem__, up_uids))))
+
+
+# ── Default fill solution ─────────────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def _default_mix(sol_number: int) -> Dict[int, float]:
+    """Quality dict of 100 % sol_number; one shared instance."""
+    return {sol_number: 1.0}
+
+
+def _default_fill_solution(input_sol: Any) -> Dict[int, float]:
+    """
+    Return the fallback fill mixture: input_sol[0], or else the first
+    solution object in input_sol, at fraction 1.0.
+
+    Raises KeyError when input_sol holds no solution object.
+    """
+    candidate = input_sol.get(0, None)
+    if candidate is None:
+        for v in input_sol.values():
+            if hasattr(v, 'number'):
+                candidate = v
+                break
+    if candidate is None:
+        raise KeyError("No valid solution object in input_sol for fallback fill")
+    return _default_mix(candidate.number)
+
+
 # ── HydraulicCache ────────────────────────────────────────────────────────────
 
 class HydraulicCache:
@@ -201,6 +242,10 @@ class Solver:
         # filled_links as a set for O(1) membership test
         self.filled_links: Set[str] = set()
 
+        # Number of run_traces()/fill_network() passes so far; any change
+        # means node outlet state may have changed since it was last read.
+        self.trace_count: int = 0
+
         # Precomputed adjacency — refreshed each step by _build_adjacency()
         self._up_links:   Dict[str, List[str]] = {}   # node_uid -> [link_uid, ...]
         self._down_links: Dict[str, List[str]] = {}   # node_uid -> [link_uid, ...]
@@ -211,8 +256,17 @@ class Solver:
         self._flow: Dict[str, float] = {}   # link_uid -> flow [m³/h]
         self._vel:  Dict[str, float] = {}   # link_uid -> velocity [m/s]
 
-        # Ready set
-        self._ready: Set[str] = set()
+        # Ready set, plus per node the number of upstream links not yet in it
+        self._ready:   Set[str]       = set()
+        self._pending: Dict[str, int] = {}
+
+        # Topological node order of the current adjacency; built lazily by
+        # _topological_order() and dropped whenever the adjacency changes.
+        self._topo_order: Optional[List[str]]     = None
+        self._topo_pos:   Optional[Dict[str, int]] = None
+        # Direction/activity bits per link of the current adjacency, see
+        # _build_adjacency(); None forces a rebuild.
+        self._adj_pattern: Optional[List[int]] = None
 
         # Optional HydraulicCache for pre-computed hydraulics
         self._hcache:      Optional[Any] = None
@@ -221,6 +275,22 @@ class Solver:
         # Fast uid -> object lookups
         self._link_obj: Dict[str, Any] = {l.uid: l for l in network.links}
         self._node_obj: Dict[str, Any] = {n.uid: n for n in network.nodes}
+        self._link_list: List[Any]     = list(self._link_obj.values())
+        self._link_uids: List[str]     = list(self._link_obj)
+
+        # Static topology, resolved once: the models are built for this
+        # network at construction, so its links and nodes do not change.
+        self._link_ends: List[tuple] = [
+            (l, l.uid, l.index, l.from_node, l.to_node) for l in self._link_list
+        ]
+        self._tank_uids: Set[str] = {t.uid for t in network.tanks}
+
+        # Flow sign per link (in _link_list order) at the last
+        # check_connections(); None until the first full check.
+        self._checked_forward: Optional[np.ndarray] = None
+        # _adj_pattern seen by the last check_connections(); while the
+        # adjacency has not been rebuilt since, no flow changed direction.
+        self._checked_pattern: Optional[List[int]] = None
 
     # ── Adjacency + hydraulic cache ───────────────────────────────────────────
 
@@ -250,19 +320,14 @@ class Solver:
             self._hcache.apply(self._hcache_step)
             self._hcache_step += 1
 
-        up:  Dict[str, List[str]] = {n.uid: [] for n in self.net.nodes}
-        dn:  Dict[str, List[str]] = {n.uid: [] for n in self.net.nodes}
-        lup: Dict[str, Any]       = {}
-        ldn: Dict[str, Any]       = {}
-
         flow_cache: Dict[str, float] = {}
         vel_cache:  Dict[str, float] = {}
+        # Per link: bit 0 = flow >= 0, bit 1 = link carries flow (|v| >= 1 mm/s)
+        pattern:    List[int]        = []
 
         _use_cache = self._hcache is not None
 
-        for link in self.net.links:
-            idx = link.index
-
+        for link, l_uid, idx, _, _ in self._link_ends:
             if _use_cache:
                 flow = link._values.get(_EN_FLOW, 0.0)
                 vel  = link._values.get(_EN_LINK_VELOCITY, 0.0)
@@ -272,128 +337,275 @@ class Solver:
                 link._values[_EN_FLOW]          = flow
                 link._values[_EN_LINK_VELOCITY] = vel
 
-            flow_cache[link.uid] = flow
-            vel_cache[link.uid]  = vel
-
-            if flow >= 0:
-                u_node, d_node = link.from_node, link.to_node
-            else:
-                u_node, d_node = link.to_node, link.from_node
-
-            lup[link.uid] = u_node
-            ldn[link.uid] = d_node
-
-            if abs(vel) >= 0.001:
-                up[d_node.uid].append(link.uid)
-                dn[u_node.uid].append(link.uid)
-
-        self._up_links   = up
-        self._down_links = dn
-        self._link_up    = lup
-        self._link_dn    = ldn
-        self._flow       = flow_cache
-        self._vel        = vel_cache
+            flow_cache[l_uid] = flow
+            vel_cache[l_uid]  = vel
+            pattern.append((flow >= 0) | ((abs(vel) >= 0.001) << 1))
+
+        self._flow = flow_cache
+        self._vel  = vel_cache
+
+        # The adjacency only depends on the flow direction and the active
+        # links; when neither changed since the last step, the lists and the
+        # topological order are reused as they are.
+        rebuilt = pattern != self._adj_pattern
+        if rebuilt:
+            up:  Dict[str, List[str]] = {uid: [] for uid in self._node_obj}
+            dn:  Dict[str, List[str]] = {uid: [] for uid in self._node_obj}
+            lup: Dict[str, Any]       = {}
+            ldn: Dict[str, Any]       = {}
+
+            for (_, l_uid, _, from_node, to_node), bits in zip(self._link_ends, pattern):
+                if bits & 1:
+                    u_node, d_node = from_node, to_node
+                else:
+                    u_node, d_node = to_node, from_node
+
+                lup[l_uid] = u_node
+                ldn[l_uid] = d_node
+
+                if bits & 2:
+                    up[d_node.uid].append(l_uid)
+                    dn[u_node.uid].append(l_uid)
+
+            self._up_links    = up
+            self._down_links  = dn
+            self._link_up     = lup
+            self._link_dn     = ldn
+            self._topo_order  = None
+            self._topo_pos    = None
+            self._adj_pattern = pattern
+        self._reset_pending()
 
         # ── Nodes: demand + volume (tank) + outflow (reservoir/tank) ─────────
-        reservoir_uids = {r.uid for r in self.net.reservoirs}
-        tank_uids      = {t.uid for t in self.net.tanks}
+        tank_uids   = self._tank_uids
+        node_models = self.models.nodes
+        dn          = self._down_links
+        link_obj    = self._link_obj
 
-        for node in self.net.nodes:
+        for node_uid, node in self._node_obj.items():
             if not _use_cache:
                 idx    = node.index
                 demand = ep.ENgetnodevalue(idx, _EN_NODE_DEMAND)
                 if demand is not None:
                     node._values[_EN_NODE_DEMAND] = demand
-                if node.uid in tank_uids:
+                if node_uid in tank_uids:
                     vol = ep.ENgetnodevalue(idx, _EN_TANKVOLUME)
                     if vol is not None:
                         node._values[_EN_TANKVOLUME] = vol
 
-            outflow = sum(abs(flow_cache[l_uid])
-                          for l_uid in dn.get(node.uid, []))
+            dn_uids = dn.get(node_uid, [])
+            outflow = sum(abs(flow_cache[l_uid]) for l_uid in dn_uids)
             try:
                 object.__setattr__(node, '_cached_outflow', outflow)
             except Exception:
                 pass
 
+            # Hand the resolved downstream links to the node model so mix()
+            # does not query EPyNet again; the order matches push_pull below.
+            if rebuilt:
+                node_model = node_models.get(node_uid)
+                if node_model is not None:
+                    node_model._downstream_links = [link_obj[l_uid] for l_uid in dn_uids]
+
+    # ── Topological order ─────────────────────────────────────────────────────
+
+    def _topological_order(self) -> List[str]:
+        """
+        Return the node uids in topological flow order (Kahn's algorithm).
+
+        Computed once per adjacency build. Nodes on a flow cycle are left
+        out: their upstream links can never all become ready, so a trace
+        would skip them anyway.
+        """
+        if self._topo_order is None:
+            indeg   = {uid: len(links) for uid, links in self._up_links.items()}
+            order   = [uid for uid, d in indeg.items() if d == 0]
+            down    = self._down_links
+            link_dn = self._link_dn
+            for node_uid in order:               # order grows while iterating
+                for l_uid in down.get(node_uid, []):
+                    dn_uid = link_dn[l_uid].uid
+                    indeg[dn_uid] -= 1
+                    if indeg[dn_uid] == 0:
+                        order.append(dn_uid)
+            if len(order) < len(indeg):
+                logger.debug("%d nodes on a flow cycle left out of the trace order",
+                             len(indeg) - len(order))
+            self._topo_order = order
+            self._topo_pos   = {uid: i for i, uid in enumerate(order)}
+        return self._topo_order
+
+    def _trace_order(self, *start_uids: str) -> Iterator[str]:
+        """
+        Iterate over the nodes that can be reached from the start nodes, as
+        the tail of the topological order beginning at the earliest start.
+        Nodes earlier in the order cannot lie downstream of any of them.
+
+        The cached order is walked in place rather than sliced, so a trace
+        does not copy the node list.
+        """
+        order     = self._topological_order()
+        topo_pos  = self._topo_pos
+        positions = [topo_pos[uid] for uid in start_uids if uid in topo_pos]
+        if not positions:
+            return iter(())
+        return islice(order, min(positions), None)
+
     # ── Ready state ───────────────────────────────────────────────────────────
 
     def reset_ready_state(self) -> None:
         self._ready.clear()
+        self._reset_pending()
         for lm in self.models.links.values():
             lm.ready = False
 
-    # ── Iterative BFS trace ───────────────────────────────────────────────────
+    def _reset_pending(self) -> None:
+        """Recount the unready upstream links of every node."""
+        ready = self._ready
+        if not ready:
+            self._pending = {uid: len(links) for uid, links in self._up_links.items()}
+        else:
+            self._pending = {
+                uid: sum(1 for l_uid in links if l_uid not in ready)
+                for uid, links in self._up_links.items()
+            }
+
+    # ── Topological trace ─────────────────────────────────────────────────────
 
     def run_trace(self, start_node: Any, timestep: float, input_sol: Any) -> None:
-        queue:   deque    = deque([start_node.uid])
-        visited: Set[str] = set()
+        self.run_traces([start_node], timestep, input_sol)
 
-        while queue:
-            node_uid = queue.popleft()
-            if node_uid in visited:
+    def run_traces(self, start_nodes: List[Any], timestep: float,
+                   input_sol: Any) -> None:
+        """
+        Trace from several start nodes (reservoirs) in one pass over the
+        topological order.
+
+        Equivalent to calling run_trace() for each start node in turn: a
+        node is mixed once, as soon as all its upstream links are ready,
+        and mixing only depends on its own inflow. Walking the order once
+        instead of once per reservoir keeps a step O(V + E) on networks
+        with many sources.
+        """
+        self.trace_count += 1
+
+        # Hot-loop lookups bound once per trace instead of once per hop
+        up_links    = self._up_links
+        down_links  = self._down_links
+        link_dn     = self._link_dn
+        flows       = self._flow
+        ready       = self._ready
+        pending     = self._pending
+        node_obj    = self._node_obj
+        link_models = self.models.links
+        node_models = self.models.nodes
+
+        # Walk the topological order from the first start node: every
+        # upstream node reached by the trace has been processed before its
+        # downstream neighbours, so each node is examined exactly once.
+        # A node is ready once its pending upstream-link count hits zero.
+        reached: Set[str] = {node.uid for node in start_nodes}
+
+        for node_uid in self._trace_order(*reached):
+            if node_uid not in reached or pending[node_uid]:
                 continue
 
-            up_uids = self._up_links.get(node_uid, [])
-            if not all(uid in self._ready for uid in up_uids):
-                continue
+            up_uids = up_links.get(node_uid, [])
 
-            visited.add(node_uid)
-            node = self._node_obj[node_uid]
+            node       = node_obj[node_uid]
+            node_model = node_models[node_uid]
 
-            inflow = []
-            for l_uid in up_uids:
-                inflow.extend(self.models.links[l_uid].output_state)
+            inflow = _gather_inflow(link_models, up_uids)
 
             try:
-                self.models.nodes[node_uid].mix(inflow, node, timestep, input_sol)
+                node_model.mix(inflow, node, timestep, input_sol)
             except Exception as e:
                 logger.error("Error mixing on node %s: %s", node_uid, e)
                 raise
 
-            node_model           = self.models.nodes[node_uid]
-            node_model.flowcount = 0
-
-            for l_uid in self._down_links.get(node_uid, []):
-                flow_in  = round(abs(self._flow[l_uid]) / 3600 * timestep, 7)
-                flow_cnt = node_model.flowcount
+            # Outflow slot counter kept local and stored on the model once
+            outflow  = node_model.outflow
+            flow_cnt = 0
 
+            for l_uid in down_links.get(node_uid, []):
+                # Quantised to 7 dp: pipe outputs then end exactly on the
+                # parcel edges instead of at float residue (x1 = 1 ± 1 ulp),
+                # which Junction.mix would turn into zero-width cells.
+                flow_in = round(abs(flows[l_uid]) / 3600 * timestep, 7)
                 try:
-                    volumes = node_model.outflow[flow_cnt]
-                    self.models.links[l_uid].push_pull(flow_in, volumes)
-                    self._ready.add(l_uid)
-                    self.models.links[l_uid].ready = True
+                    volumes    = outflow[flow_cnt]
+                    link_model = link_models[l_uid]
+                    link_model.push_pull(flow_in, volumes)
+                    link_model.ready = True
                 except IndexError:
-                    logger.debug(
-                        "outflow[%d] missing for link %s — skipped",
-                        flow_cnt, l_uid,
-                    )
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "outflow[%d] missing for link %s — skipped",
+                            flow_cnt, l_uid,
+                        )
                     continue
                 except Exception as e:
+                    node_model.flowcount = flow_cnt
                     logger.error("Error in push_pull for link %s: %s", l_uid, e)
                     raise
 
-                node_model.flowcount += 1
-                queue.append(self._link_dn[l_uid].uid)
+                flow_cnt += 1
+                dn_uid = link_dn[l_uid].uid
+                if l_uid not in ready:
+                    ready.add(l_uid)
+                    pending[dn_uid] -= 1
+                reached.add(dn_uid)
+
+            node_model.flowcount = flow_cnt
 
     # ── Flow direction check ──────────────────────────────────────────────────
 
     def check_connections(self) -> None:
+        """
+        Reverse the parcels of every link whose flow direction changed.
+
+        After one full pass the flow sign of every link is remembered; later
+        calls compare the new signs against it in one vectorised step and
+        only inspect the links that actually flipped.
+        """
+        link_up = self._link_up
+        if not link_up:
+            return                               # adjacency not built yet
+        pattern = self._adj_pattern
+        if (pattern is not None and pattern is self._checked_pattern
+                and self._checked_forward is not None):
+            return                               # no rebuild, no reversal
+
+        link_dn = self._link_dn
+        links   = self._link_list
+        flow    = np.fromiter(map(self._flow.get, self._link_uids, repeat(0.0)),
+                              dtype=np.float64, count=len(links))
+        forward = flow >= 0
+
+        if self._checked_forward is None:
+            candidates = links
+        else:
+            candidates = [links[i] for i in
+                          np.flatnonzero(forward != self._checked_forward)]
+
         reversed_count = 0
-        for link in self.net.links:
+        for link in candidates:
             lm    = self.models.links[link.uid]
-            new_u = self._link_up.get(link.uid)
-            new_d = self._link_dn.get(link.uid)
+            new_u = link_up.get(link.uid)
+            new_d = link_dn.get(link.uid)
             if new_u is None or new_d is None:
                 continue
             if lm.upstream_node is new_u and lm.downstream_node is new_d:
                 continue
             lm.reverse_parcels(new_d, new_u)
             reversed_count += 1
+
+        self._checked_forward = forward
+        self._checked_pattern = pattern
         if reversed_count:
             logger.info("%d links reversed due to flow direction change", reversed_count)
 
-    # ── Iterative network fill ────────────────────────────────────────────────
+    # ── Network fill ──────────────────────────────────────────────────────────
 
     def fill_network(self, start_node: Any, input_sol: Any,
                      fill_timestep: float = 3600.0) -> None:
@@ -403,7 +615,9 @@ class Solver:
         Parameters
         ----------
         start_node : epynet node
-            Starting point of the BFS fill (typically a reservoir).
+            Starting point of the fill (typically a reservoir). Nodes are
+            visited in topological order without recursion, so long serial
+            pipe runs are not limited by the Python recursion depth.
         input_sol : dict
             Input solutions per node uid.
         fill_timestep : float
@@ -411,41 +625,50 @@ class Solver:
             phase. Default 3600 s. Previously hardcoded as 60 s, which could
             produce incorrect fill fractions at low flow velocities.
         """
-        queue:   deque    = deque([start_node.uid])
-        visited: Set[str] = set()
-
-        while queue:
-            node_uid = queue.popleft()
-            if node_uid in visited:
+        self.trace_count += 1
+
+        up_links    = self._up_links
+        down_links  = self._down_links
+        link_dn     = self._link_dn
+        ready       = self._ready
+        pending     = self._pending
+        node_obj    = self._node_obj
+        link_models = self.models.links
+        node_models = self.models.nodes
+        filled_add  = self.filled_links.add
+
+        reached: Set[str] = {start_node.uid}
+
+        for node_uid in self._trace_order(start_node.uid):
+            if node_uid not in reached or pending[node_uid]:
                 continue
 
-            up_uids = self._up_links.get(node_uid, [])
-            if not all(uid in self._ready for uid in up_uids):
-                continue
+            up_uids = up_links.get(node_uid, [])
 
-            visited.add(node_uid)
-            node = self._node_obj[node_uid]
+            node       = node_obj[node_uid]
+            node_model = node_models[node_uid]
 
-            inflow = []
-            for l_uid in up_uids:
-                inflow.extend(self.models.links[l_uid].output_state)
+            inflow = _gather_inflow(link_models, up_uids)
 
             try:
-                self.models.nodes[node_uid].mix(inflow, node, fill_timestep, input_sol)
+                node_model.mix(inflow, node, fill_timestep, input_sol)
             except Exception as e:
                 logger.error("Error initializing node %s: %s", node_uid, e)
                 raise
 
-            node_outflow = self.models.nodes[node_uid].outflow
+            node_outflow = node_model.outflow
 
-            for i, l_uid in enumerate(self._down_links.get(node_uid, [])):
-                lm  = self.models.links[l_uid]
+            for i, l_uid in enumerate(down_links.get(node_uid, [])):
+                lm  = link_models[l_uid]
                 sol = self._select_fill_solution(node_outflow, i, input_sol)
                 lm.fill(sol)
-                self._ready.add(l_uid)
                 lm.ready = True
-                self.filled_links.add(l_uid)           # set.add() instead of list.append()
-                queue.append(self._link_dn[l_uid].uid)
+                filled_add(l_uid)                      # set.add() instead of list.append()
+                dn_uid = link_dn[l_uid].uid
+                if l_uid not in ready:
+                    ready.add(l_uid)
+                    pending[dn_uid] -= 1
+                reached.add(dn_uid)
 
     @staticmethod
     def _select_fill_solution(node_outflow: list, i: int, input_sol: Any) -> Any:
@@ -454,15 +677,7 @@ class Solver:
         elif node_outflow and node_outflow[0]:
             return node_outflow[0][0][1]
         else:
-            candidate = input_sol.get(0, None)
-            if candidate is None:
-                for v in input_sol.values():
-                    if hasattr(v, 'number'):
-                        candidate = v
-                        break
-            if candidate is None:
-                raise KeyError("No valid solution object in input_sol for fallback fill")
-            return {candidate.number: 1.0}
+            return _default_fill_solution(input_sol)
 
     # ── Backward compatibility ────────────────────────────────────────────────
 
@@ -472,8 +687,7 @@ class Solver:
         return [self._link_obj[u] for u in uids]
 
     def _get_node_attr(self, obj: Any, attr: str) -> Any:
-        v = getattr(obj, attr)
-        return v() if callable(v) else v
+        return _get_attr_value(obj, attr)
 
     def _all_upstream_links_ready(self, node: Any) -> bool:
         return all(uid in self._ready for uid in self._up_links.get(node.uid, []))
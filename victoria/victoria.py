@@ -18,16 +18,20 @@ Changes compared to v1:
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Set, Optional
+from operator import methodcaller
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Set, Optional, Tuple
 import logging
+import numpy as np
 
-from .solver import Solver
-from .quality import Quality
+from .solver import Solver, _default_fill_solution
+from .quality import Quality, NodeProperties
 from .models import Models
 from .segmentation import PipeSegmentation
 
 logger = logging.getLogger(__name__)
 
+_parcel_q = methodcaller('get', 'q', {})    # parcel -> quality dict
+
 
 class Victoria:
     """
@@ -47,6 +51,10 @@ class Victoria:
     5. Use the get_* methods to query water quality.
     """
 
+    # garbage_collect(flush=False) defers pp.remove_solutions until at least
+    # this many solutions can be removed in one call.
+    gc_batch_size: int = 1024
+
     def __init__(self, network: Any, pp: Any):
         """
         Initialise the Victoria simulator.
@@ -66,6 +74,16 @@ class Victoria:
         # hydraulic state — prevents stale BFS in step().
         self._adjacency_built: bool = False
 
+        # Memo of the node queries that mix or average parcels, keyed by
+        # (query, node uid, *args) and holding (node model, value). Valid
+        # while solver.trace_count equals _query_tick; see _cached_query().
+        self._query_cache: Dict[Tuple[Any, ...], Tuple[Any, Any]] = {}
+        self._query_tick:  Optional[int] = None
+
+        # (registered solutions, Quality mix count) seen by the last
+        # garbage_collect; lets flush=False skip PHREEQC when nothing changed.
+        self._gc_snapshot: Optional[Tuple[FrozenSet[int], int]] = None
+
         logger.info("Victoria simulator initialized")
 
     # ── Simulation step ───────────────────────────────────────────────────────
@@ -80,6 +98,10 @@ class Victoria:
         It is still recommended to call check_flow_direction() explicitly
         whenever flow directions may change.
 
+        All reservoirs are traced in a single in-process pass: traces from
+        different reservoirs meet at shared junctions, and parcel qualities
+        refer to solutions of the one PhreeqPython instance.
+
         Args:
             timestep:  Time step duration in seconds (must be positive).
             input_sol: Dict mapping node uid to PHREEQC solution.
@@ -88,14 +110,45 @@ class Victoria:
             raise ValueError(f"Timestep must be positive, got {timestep}")
 
         self._ensure_adjacency()
+        self._query_cache.clear()
         logger.debug("Running quality step for timestep=%ss", timestep)
 
-        for reservoir in self.net.reservoirs:
-            self._run_safe_trace(reservoir, timestep, input_sol)
+        self._run_safe_traces(self.net.reservoirs, timestep, input_sol)
 
         self.solver.reset_ready_state()
         self._adjacency_built = False   # Mark as stale for the next step
 
+    def step_many(self, n_steps: int, timestep: float, input_sol: Dict) -> None:
+        """
+        Simulate n_steps time steps under the current hydraulic state.
+
+        Equivalent to calling step() n_steps times without re-solving the
+        hydraulics in between, but the adjacency is built once for the
+        whole run. Use it for periods in which flows do not change.
+
+        Args:
+            n_steps:   Number of time steps to simulate.
+            timestep:  Time step duration in seconds (must be positive).
+            input_sol: Dict mapping node uid to PHREEQC solution.
+        """
+        if timestep <= 0:
+            raise ValueError(f"Timestep must be positive, got {timestep}")
+        if n_steps < 0:
+            raise ValueError(f"n_steps must be non-negative, got {n_steps}")
+
+        self._ensure_adjacency()
+        self._query_cache.clear()
+        logger.debug("Running %d quality steps for timestep=%ss", n_steps, timestep)
+
+        reservoirs  = list(self.net.reservoirs)
+        run_traces  = self._run_safe_traces
+        reset_ready = self.solver.reset_ready_state
+        for _ in range(n_steps):
+            run_traces(reservoirs, timestep, input_sol)
+            reset_ready()
+
+        self._adjacency_built = False   # Mark as stale for the next step
+
     def _ensure_adjacency(self) -> None:
         """Build adjacency if it has not yet been built for the current hydraulic step."""
         if not self._adjacency_built:
@@ -107,11 +160,13 @@ class Victoria:
                 self.solver._build_adjacency()
             self._adjacency_built = True
 
-    def _run_safe_trace(self, emitter: Any, timestep: float, input_sol: Dict) -> None:
+    def _run_safe_traces(self, emitters: Any, timestep: float, input_sol: Dict) -> None:
+        emitters = list(emitters)
         try:
-            self.solver.run_trace(emitter, timestep, input_sol)
+            self.solver.run_traces(emitters, timestep, input_sol)
         except Exception as e:
-            logger.error("Error tracing from reservoir %s: %s", emitter.uid, e)
+            logger.error("Error tracing from reservoirs %s: %s",
+                         [emitter.uid for emitter in emitters], e)
             raise
 
     # ── Network initialisation ────────────────────────────────────────────────
@@ -129,53 +184,76 @@ class Victoria:
             fill_timestep:  Time step (seconds) for fill volume calculations.
                             Default 3600 s. Adjust if the hydraulic time step
                             differs significantly.
+
+        Raises:
+            KeyError: If a reservoir with active outgoing flow has no entry
+                      in input_sol (checked before anything is filled), or
+                      if a default fill is needed and input_sol holds no
+                      solution object.
         """
         logger.info("Filling network with initial solutions")
+        self._query_cache.clear()
 
         if hasattr(self.solver, '_build_adjacency'):
             self.solver._build_adjacency()
             self._adjacency_built = True
 
         def _get_default_solution(sol_dict: Dict) -> Dict[int, float]:
-            candidate = sol_dict.get(0, None)
-            if candidate is None:
-                for v in sol_dict.values():
-                    if hasattr(v, 'number'):
-                        candidate = v
-                        break
-            if candidate is None:
+            try:
+                return _default_fill_solution(sol_dict)
+            except KeyError:
                 logger.error("No solution object found in input_sol for default fill")
-                raise KeyError("No valid solution object in input_sol")
-            return {candidate.number: 1.0}
+                raise
 
         if from_reservoir:
-            for emitter in self.net.reservoirs:
-                try:
-                    self.solver.fill_network(emitter, input_sol,
-                                             fill_timestep=fill_timestep)
-                except KeyError:
-                    logger.error("No solution defined for reservoir %s", emitter.uid)
-                    raise
+            # Check the feeding reservoirs up front so a missing solution
+            # cannot abort the fill halfway through the network. A reservoir
+            # without active outgoing links fills nothing and is skipped.
+            down_links = self.solver._down_links
+            reservoirs = []
+            missing    = []
+            for r in self.net.reservoirs:
+                if r.uid in input_sol:
+                    reservoirs.append(r)
+                elif down_links.get(r.uid):
+                    missing.append(r.uid)
+                else:
+                    logger.warning(
+                        "No solution defined for reservoir %s; it has no "
+                        "outgoing flow and is skipped", r.uid
+                    )
+            if missing:
+                logger.error("No solution defined for reservoir(s) %s", missing)
+                raise KeyError(f"No solution defined for reservoir(s) {missing}")
+
+            # Links filled by an earlier call must not count as filled now
+            self.solver.filled_links.clear()
+            for emitter in reservoirs:
+                self.solver.fill_network(emitter, input_sol,
+                                         fill_timestep=fill_timestep)
 
             # Fill any remaining pipes with the default solution
-            link_uids     = {link.uid for link in self.net.links}
-            filled_uids   = self.solver.filled_links          # al een set
-            unfilled_uids = link_uids - filled_uids
-
-            if unfilled_uids:
+            # models.pipes holds every pipe model by uid, resolved once at
+            # load time; no EPyNet objects are touched here.
+            filled_uids = self.solver.filled_links          # al een set
+            unfilled    = [pipe_model for uid, pipe_model
+                           in self.solver.models.pipes.items()
+                           if uid not in filled_uids]
+
+            if unfilled:
                 logger.info(
-                    "Filling %d unfilled links with default solution",
-                    len(unfilled_uids),
+                    "Filling %d unfilled pipes with default solution",
+                    len(unfilled),
                 )
                 default_sol = _get_default_solution(input_sol)
-                for link in self.net.links:
-                    if link.uid in unfilled_uids and link.uid in self.solver.models.pipes:
-                        self.solver.models.pipes[link.uid].fill(default_sol)
+                for pipe_model in unfilled:
+                    pipe_model.fill(default_sol)
         else:
-            logger.info("Filling all pipes with default solution")
             default_sol = _get_default_solution(input_sol)
-            for pipe in self.net.pipes:
-                self.solver.models.pipes[pipe.uid].fill(default_sol)
+            logger.info("Filling all pipes with default solution %s",
+                        next(iter(default_sol)))
+            for pipe_model in self.solver.models.pipes.values():
+                pipe_model.fill(default_sol)
 
         self.solver.reset_ready_state()
         logger.info("Network filling complete")
@@ -198,7 +276,8 @@ class Victoria:
     # ── Memory cleanup ────────────────────────────────────────────────────────
 
     def garbage_collect(self, input_sol: Optional[Dict] = None,
-                        preserve: Optional[Set[int]] = None) -> None:
+                        preserve: Optional[Set[int]] = None,
+                        flush: bool = True) -> None:
         """
         Remove unused PHREEQC solutions from memory.
         Call periodically to prevent memory buildup from unused solution objects.
@@ -206,43 +285,61 @@ class Victoria:
         Also clears the PHREEQC mixture cache in Quality so that removed
         solutions no longer surface as cache hits.
 
+        With flush=False the removal is skipped until at least
+        gc_batch_size solutions are unused. Unused solutions stay unused,
+        so they are simply picked up by a later call; this trades some
+        PHREEQC memory for fewer remove_solutions calls (and mix cache
+        resets) when garbage_collect is called every step. Such a call
+        also returns without querying PHREEQC at all when the referenced
+        solutions and the mixtures created by Quality are unchanged since
+        the previous call.
+
         Args:
             input_sol: Dict of input solutions to preserve (optional).
             preserve:  Extra set of PHREEQC solution numbers to always keep
                        (e.g. persistent end-members).
+            flush:     Remove the unused solutions now, however few
+                       (default True).
         """
         registered_solutions: Set[int] = set()
 
+        # Quality dicts are largely shared between parcels (interned
+        # mixtures, fill solutions), so they are first collected by
+        # identity and their keys are read once per distinct dict.
+        q_dicts: Dict[int, Dict] = {}
+
         def _collect_from_parcels(parcel_list: list) -> None:
-            for parcel in parcel_list:
-                registered_solutions.update(parcel.get('q', {}).keys())
+            q_dicts.update((id(q), q) for q in map(_parcel_q, parcel_list))
+
+        models = self.solver.models
 
         # Pipes
-        for pipe in self.solver.models.pipes.values():
+        for pipe in models.pipes.values():
             if hasattr(pipe, 'state'):
                 _collect_from_parcels(pipe.state)
             if hasattr(pipe, 'output_state'):
                 _collect_from_parcels(pipe.output_state)
 
         # All links (pumps, valves)
-        for link in self.solver.models.links.values():
+        for link in models.links.values():
             if hasattr(link, 'output_state'):
                 _collect_from_parcels(link.output_state)
 
         # Tanks
-        for tank in self.solver.models.tanks.values():
+        for tank in models.tanks.values():
             if hasattr(tank, 'state'):
                 _collect_from_parcels(tank.state)
             if getattr(tank, 'mixture', None) and isinstance(tank.mixture, dict):
                 registered_solutions.update(tank.mixture.keys())
 
         # Node output
-        for node in self.solver.models.nodes.values():
+        for node in models.nodes.values():
             if hasattr(node, 'mixed_parcels'):
                 _collect_from_parcels(node.mixed_parcels)
             for slot in getattr(node, 'outflow', []):
-                for v, q in slot:
-                    registered_solutions.update(q.keys())
+                q_dicts.update((id(q), q) for _, q in slot)
+
+        registered_solutions.update(*q_dicts.values())
 
         # Preserve all solution objects from input_sol
         if input_sol:
@@ -254,13 +351,27 @@ class Victoria:
         if preserve:
             registered_solutions.update(preserve)
 
+        snapshot = (frozenset(registered_solutions), self.quality._mix_count)
+        if not flush and snapshot == self._gc_snapshot:
+            logger.debug("Solution references unchanged; "
+                         "skipping garbage collection")
+            return
+        self._gc_snapshot = snapshot
+
         phreeqc_solutions = set(self.pp.get_solution_list())
         to_forget         = phreeqc_solutions - registered_solutions
+        if not flush and len(to_forget) < self.gc_batch_size:
+            logger.debug("Deferring removal of %d unused PHREEQC solutions",
+                         len(to_forget))
+            return
         if to_forget:
             logger.info("Removing %d unused PHREEQC solutions", len(to_forget))
             self.pp.remove_solutions(to_forget)
-            # Clear the PHREEQC mixture cache — stale entries are now invalid
-            self.quality.invalidate_mix_cache()
+            # Clear the PHREEQC mixture cache — stale entries are now invalid.
+            # The remaining solution set is known here, so Quality does not
+            # need to fetch the list from PHREEQC again.
+            phreeqc_solutions -= to_forget
+            self.quality.invalidate_mix_cache(available=phreeqc_solutions)
 
     # ── Quality queries ───────────────────────────────────────────────────────
 
@@ -270,7 +381,8 @@ class Victoria:
 
     def get_conc_node_avg(self, node: Any, element: str, units: str = 'mmol') -> float:
         """Return time-averaged concentration at the node outlet."""
-        return self.quality.get_conc_node_avg(node, element, units)
+        return self._cached_query('conc_avg', node,
+                                  self.quality.get_conc_node_avg, element, units)
 
     def get_mixture_node(self, node: Any) -> Dict[int, float]:
         """Return instantaneous solution mixture at the node outlet."""
@@ -278,7 +390,8 @@ class Victoria:
 
     def get_mixture_node_avg(self, node: Any) -> Dict[int, float]:
         """Return time-averaged solution mixture at the node outlet."""
-        return self.quality.get_mixture_node_avg(node)
+        return dict(self._cached_query('mixture_avg', node,
+                                       self.quality.get_mixture_node_avg))
 
     def get_conc_pipe(self, link: Any, element: str, units: str = 'mmol') -> List[Dict]:
         """Return concentration profile along a pipe."""
@@ -292,13 +405,63 @@ class Victoria:
         """Return all parcels in a pipe."""
         return self.quality.get_parcels(link)
 
-    def get_properties_node(self, node: Any) -> List[float]:
-        """Return instantaneous water properties at the node outlet."""
-        return self.quality.get_properties_node(node)
+    def get_properties_node(self, node: Any) -> NodeProperties:
+        """Return instantaneous (pH, sc, temperature) at the node outlet."""
+        return self._cached_query('properties', node,
+                                  self.quality.get_properties_node)
+
+    def get_properties_node_avg(self, node: Any) -> NodeProperties:
+        """Return time-averaged (pH, sc, temperature) at the node outlet."""
+        return self._cached_query('properties_avg', node,
+                                  self.quality.get_properties_node_avg)
+
+    def _cached_query(self, query: str, node: Any,
+                      compute: Callable[..., Any], *args: Any) -> Any:
+        """
+        Return compute(node, *args), evaluated at most once per solver pass.
+
+        The cache is dropped as soon as the solver has run another trace
+        (solver.trace_count), also when run_trace()/run_traces() are called
+        directly. An entry only counts for the node model it was computed
+        from, so a model replaced by Models.set_tank_model() is re-queried.
+        """
+        tick = self.solver.trace_count
+        if tick != self._query_tick:
+            self._query_cache.clear()
+            self._query_tick = tick
+
+        key   = (query, node.uid) + args
+        model = self.models.nodes.get(node.uid)
+        entry = self._query_cache.get(key)
+        if entry is not None and entry[0] is model:
+            return entry[1]
+        value = compute(node, *args)
+        self._query_cache[key] = (model, value)
+        return value
+
+    def clear_query_cache(self) -> None:
+        """
+        Forget memoised node query results.
 
-    def get_properties_node_avg(self, node: Any) -> List[float]:
-        """Return time-averaged water properties at the node outlet."""
-        return self.quality.get_properties_node_avg(node)
+        Only needed after node model state (e.g. mixed_parcels) has been
+        edited by hand; simulation calls invalidate the cache themselves.
+        """
+        self._query_cache.clear()
+
+    def get_conc_nodes(self, nodes: Iterable[Any], element: str,
+                       units: str = 'mmol', avg: bool = False) -> np.ndarray:
+        """Return outlet concentrations of all *nodes* as one array."""
+        return self.quality.get_conc_nodes(nodes, element, units, avg)
+
+    def get_conc_pipes_avg(self, links: Iterable[Any], element: str,
+                           units: str = 'mmol') -> np.ndarray:
+        """Return volume-averaged concentrations of all *links* as one array."""
+        return self.quality.get_conc_pipes_avg(links, element, units)
+
+    def get_properties_nodes(self, nodes: Iterable[Any],
+                             avg: bool = False) -> np.ndarray:
+        """Return (pH, sc, temperature) rows for all *nodes* as one array."""
+        return self.quality.get_properties_nodes(nodes, avg)
 
     # ── Pipe segmentation ────────────────────────────────────────────────────
 